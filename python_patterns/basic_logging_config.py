@@ -1,15 +1,33 @@
+import atexit
+import gzip
+import json
 import logging
 import os
+import queue
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from structured_log_format import encode_binary_record, read_binary_log, read_json_log
+
+try:
+    import zstandard  # Optional: enables compression="zstd" for rotated segments
+except ImportError:
+    zstandard = None
 
 # Create a logs directory if it doesn't exist
 LOG_DIR = "logs"
 os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, "app.log")
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
 # Configure logging settings
 logging.basicConfig(
     level=logging.DEBUG,  # Set logging level
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
         logging.FileHandler(LOG_FILE),  # Save logs to a file
         logging.StreamHandler()  # Print logs to console
@@ -27,7 +45,456 @@ def log_messages():
     logger.error("This is an error message")
     logger.critical("This is a critical message")
 
+# Asynchronous (queue-based) logging
+# The calling thread only puts the record on a bounded queue; a QueueListener
+# thread does the formatting and file writes, in batches, off the hot path.
+OVERFLOW_POLICIES = ("block", "drop_debug_first", "count_and_drop")
+FILE_BUFFER_SIZE = 256 * 1024  # Bytes buffered before the listener hits the disk
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler for a bounded queue with a configurable overflow policy.
+
+    - "block": the caller waits for room in the queue (nothing is lost).
+    - "drop_debug_first": DEBUG records are dropped once the queue is
+      `debug_watermark` full, keeping room for more important records;
+      other records block. An unbounded queue (maxsize <= 0) never fills,
+      so nothing is dropped.
+    - "count_and_drop": any record that does not fit is dropped and counted.
+    """
+    def __init__(self, log_queue, overflow="block", debug_watermark=0.8):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        if not 0 < debug_watermark <= 1:
+            raise ValueError(f"debug_watermark must be in (0, 1], got {debug_watermark!r}")
+        super().__init__(log_queue)
+        self.overflow = overflow
+        # None: unbounded queue, no watermark
+        self.debug_limit = (max(int(log_queue.maxsize * debug_watermark), 1)
+                            if log_queue.maxsize > 0 else None)
+        self.dropped = 0
+
+    def emit(self, record):
+        # Decide before prepare() so dropped records are never formatted
+        if (self.overflow == "drop_debug_first" and record.levelno <= logging.DEBUG
+                and self.debug_limit is not None and self.queue.qsize() >= self.debug_limit):
+            self.dropped += 1
+            return
+        super().emit(record)
+
+    def prepare(self, record):
+        # Only merge the args into the message (they may be mutated after the
+        # call returns); the full format with asctime happens on the listener.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self.overflow == "count_and_drop":
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+        else:
+            self.queue.put(record)
+
+class BufferedFileHandler(logging.FileHandler):
+    """FileHandler with a large write buffer that is only flushed on request.
+
+    StreamHandler flushes after every record; here that per-record flush is a
+    no-op and the owning listener calls force_flush() once a batch is written.
+    """
+    def __init__(self, filename, mode='a', encoding=None, buffer_size=FILE_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        super().__init__(filename, mode, encoding)
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                    encoding=self.encoding, errors=self.errors)
+
+    def flush(self):
+        pass
+
+    def force_flush(self):
+        self.acquire()
+        try:
+            if self.stream and hasattr(self.stream, "flush"):
+                self.stream.flush()
+        finally:
+            self.release()
+
+class BatchingQueueListener(QueueListener):
+    """QueueListener that flushes its handlers only when the queue runs dry.
+
+    Under load records are written back to back into the handlers' buffers;
+    as soon as there is nothing left to read the batch is flushed to disk.
+    """
+    def dequeue(self, block):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            self.flush_handlers()
+            return self.queue.get(block)
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)  # Wait for room rather than fail on a full queue
+
+    def flush_handlers(self):
+        for handler in self.handlers:
+            getattr(handler, "force_flush", handler.flush)()
+
+    def stop(self):
+        """Drains the queue, writes everything out and stops the listener thread."""
+        if self._thread is not None:
+            super().stop()
+            self.flush_handlers()
+
+# Rotating, compressing log sink
+# Rotation (by size and/or age) is a cheap rename on the logging thread; a
+# background worker then shifts app.log.N -> app.log.N+1, compresses the new
+# segment to app.log.1.gz (or .zst), applies retention and rewrites a sidecar
+# index with each segment's byte offset and time range.
+INDEX_SUFFIX = ".index.json"
+
+class RotatingCompressingFileHandler(BufferedFileHandler):
+    """Buffered file handler that rotates by size and/or time and compresses in the background.
+
+    max_bytes / interval: rotate once the active file would exceed max_bytes or
+        is older than interval seconds (0 / None disables either trigger).
+    backup_count / max_age: keep at most backup_count compressed segments and
+        drop segments whose newest record is older than max_age seconds.
+    compression: "gzip", "zstd" (needs the zstandard package) or None.
+    """
+    def __init__(self, filename, max_bytes=100 * 1024 * 1024, interval=None, backup_count=50,
+                 max_age=None, compression="gzip", encoding='utf-8', buffer_size=FILE_BUFFER_SIZE):
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("compression='zstd' requires the zstandard package")
+        super().__init__(filename, 'a', encoding, buffer_size)
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backup_count = backup_count
+        self.max_age = max_age
+        self.compression = compression
+        self.index_file = self.baseFilename + INDEX_SUFFIX
+        self.index = self._load_index()
+
+        self.segment_bytes = os.path.getsize(self.baseFilename)
+        self.segment_start = None if self.segment_bytes else time.time()  # None: unknown
+        self.segment_first = self.segment_last = None
+        self._rollovers = 0
+        self._jobs = queue.Queue()
+        self._worker = threading.Thread(target=self._compress_worker, name="LogCompressor", daemon=True)
+        self._worker.start()
+
+    def _load_index(self):
+        try:
+            with open(self.index_file, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {"segments": [], "total_bytes": 0}
+
+    def _save_index(self):
+        tmp_file = self.index_file + ".tmp"
+        with open(tmp_file, 'w') as file:
+            json.dump(self.index, file, indent=1)
+        os.replace(tmp_file, self.index_file)
+
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            size = len(msg.encode(self.encoding))
+            if self.should_rollover(record.created, size):
+                self.do_rollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(msg)
+            self.segment_bytes += size
+            self.segment_first = self.segment_first or record.created
+            self.segment_last = record.created
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def should_rollover(self, now, size):
+        if not self.segment_bytes:
+            return False
+        if self.max_bytes and self.segment_bytes + size > self.max_bytes:
+            return True
+        started = self.segment_start or self.segment_first
+        return bool(self.interval and started and now - started >= self.interval)
+
+    def do_rollover(self):
+        """Renames the active file aside and hands it to the compression worker."""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        self._rollovers += 1
+        pending = f"{self.baseFilename}.rotating-{os.getpid()}-{self._rollovers}"
+        os.rename(self.baseFilename, pending)
+        self._jobs.put((pending, {
+            "start": self.segment_first, "end": self.segment_last, "bytes": self.segment_bytes,
+        }))
+        self.segment_bytes = 0
+        self.segment_start = time.time()
+        self.segment_first = self.segment_last = None
+        self.stream = self._open()
+
+    def _segment_name(self, number):
+        suffix = {"gzip": ".gz", "zstd": ".zst"}.get(self.compression, "")
+        return f"{self.baseFilename}.{number}{suffix}"
+
+    def _compress_worker(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            try:
+                self._store_segment(*job)
+            except OSError as e:
+                print(f"Error rotating log segment {job[0]}: {e}")
+
+    def _store_segment(self, pending, segment):
+        # Shift the older segments up by one, oldest first
+        segments = self.index["segments"]
+        for number in range(len(segments), 0, -1):
+            if os.path.exists(self._segment_name(number)):
+                os.replace(self._segment_name(number), self._segment_name(number + 1))
+
+        target = self._segment_name(1)
+        with open(pending, 'rb') as src, self._open_compressed(target + ".tmp") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(target + ".tmp", target)
+        os.remove(pending)
+
+        segment["offset"] = self.index["total_bytes"]
+        self.index["total_bytes"] += segment["bytes"]
+        segments.insert(0, segment)
+
+        # Retention: drop by count, then by age
+        keep = len(segments) if self.backup_count is None else self.backup_count
+        if self.max_age:
+            cutoff = time.time() - self.max_age
+            while keep and segments[keep - 1]["end"] and segments[keep - 1]["end"] < cutoff:
+                keep -= 1
+        for number in range(keep + 1, len(segments) + 1):
+            if os.path.exists(self._segment_name(number)):
+                os.remove(self._segment_name(number))
+        del segments[keep:]
+        for number, entry in enumerate(segments, start=1):
+            entry["file"] = os.path.basename(self._segment_name(number))
+        self._save_index()
+
+    def _open_compressed(self, path):
+        if self.compression == "gzip":
+            return gzip.open(path, 'wb', compresslevel=6)
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=3).stream_writer(open(path, 'wb'))
+        return open(path, 'wb')
+
+    def close(self):
+        """Closes the active file and waits for pending compression to finish."""
+        super().close()
+        if self._worker.is_alive():
+            self._jobs.put(None)
+            self._worker.join()
+
+def segments_in_window(log_file, start=None, end=None):
+    """Returns the log segments (oldest first) that may hold records in [start, end].
+
+    Uses the sidecar index written by RotatingCompressingFileHandler, so
+    segments entirely outside the window are skipped without being opened.
+    The active log file is always included when the window reaches the present.
+    """
+    try:
+        with open(log_file + INDEX_SUFFIX, 'r') as file:
+            index = json.load(file)
+    except (OSError, ValueError):
+        index = {"segments": []}
+    log_dir = os.path.dirname(log_file)
+    selected = []
+    for entry in reversed(index["segments"]):
+        if start is not None and entry["end"] is not None and entry["end"] < start:
+            continue
+        if end is not None and entry["start"] is not None and entry["start"] > end:
+            continue
+        selected.append(os.path.join(log_dir, entry["file"]))
+    newest_end = index["segments"][0]["end"] if index["segments"] else None
+    if os.path.exists(log_file) and (end is None or newest_end is None or end >= newest_end):
+        selected.append(log_file)
+    return selected
+
+# Structured log formats
+# The record layouts and their readers (read_json_log, read_binary_log) live
+# in structured_log_format.py, shared with the scanners in
+# error_email_patterns.py. JSON lines start with "levelno" so readers can
+# filter on the level cheaply; the timestamp prefix is formatted once per
+# second instead of once per record.
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats records as compact JSON lines with a cached timestamp prefix."""
+    def __init__(self):
+        super().__init__()
+        self._time_cache = (None, "")
+
+    def format_timestamp(self, created):
+        second = int(created)
+        cached_second, prefix = self._time_cache
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second))
+            self._time_cache = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1000):03d}"
+
+    def format(self, record):
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            message = f"{message}\n{record.exc_text}"
+        # Starts with structured_log_format.JSON_LEVEL_PREFIX, which the readers rely on for level filtering
+        return (f'{{"levelno":{record.levelno},"level":"{record.levelname}",'
+                f'"ts":"{self.format_timestamp(record.created)}",'
+                f'"name":{json.dumps(record.name)},"msg":{json.dumps(message)}}}')
+
+class BinaryLogHandler(BufferedFileHandler):
+    """Appends records in the compact length-prefixed binary format (no string formatting)."""
+    def __init__(self, filename, buffer_size=FILE_BUFFER_SIZE):
+        super().__init__(filename, 'ab', None, buffer_size)
+
+    def emit(self, record):
+        try:
+            message = record.getMessage()
+            if record.exc_info:
+                message = f"{message}\n{logging.Formatter().formatException(record.exc_info)}"
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(encode_binary_record(record.created, record.levelno,
+                                                   record.name, message))
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+def setup_async_logging(log_file=LOG_FILE, level=logging.DEBUG, max_queue=10000,
+                        overflow="block", console=True, file_handler=None, formatter=None):
+    """Routes the root logger through a bounded queue to a background writer.
+
+    Pass `file_handler` (e.g. a RotatingCompressingFileHandler or a
+    BinaryLogHandler) to replace the default BufferedFileHandler on log_file,
+    and `formatter` (e.g. JsonLinesFormatter()) to replace the text format on
+    the file handler. Returns (queue_handler, listener).
+    The listener is stopped (and the queue flushed) automatically at
+    interpreter exit; call listener.stop() to do it sooner.
+    """
+    log_queue = queue.Queue(maxsize=max_queue)
+    handlers = [file_handler or BufferedFileHandler(log_file)]
+    handlers[0].setFormatter(formatter or logging.Formatter(LOG_FORMAT))
+    if console:
+        handlers.append(logging.StreamHandler())
+        handlers[1].setFormatter(logging.Formatter(LOG_FORMAT))
+
+    queue_handler = BoundedQueueHandler(log_queue, overflow)
+    listener = BatchingQueueListener(log_queue, *handlers, respect_handler_level=True)
+    logging.basicConfig(level=level, handlers=[queue_handler], force=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return queue_handler, listener
+
+def setup_sync_logging(log_file=LOG_FILE, level=logging.DEBUG, console=True):
+    """Restores the plain synchronous FileHandler/StreamHandler setup."""
+    handlers = [logging.FileHandler(log_file)]
+    if console:
+        handlers.append(logging.StreamHandler())
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers, force=True)
+
+# Benchmark: latency seen by the caller under multi-threaded load
+def _log_from_threads(n_threads, records_per_thread):
+    bench_logger = logging.getLogger("Benchmark")
+    latencies = [[] for _ in range(n_threads)]
+
+    def worker(samples):
+        for i in range(records_per_thread):
+            start = time.perf_counter_ns()
+            bench_logger.debug("hot path record %d from %s", i, threading.current_thread().name)
+            samples.append(time.perf_counter_ns() - start)
+
+    threads = [threading.Thread(target=worker, args=(samples,)) for samples in latencies]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(ns for samples in latencies for ns in samples)
+
+def _report(label, latencies):
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label:<28} mean {statistics.fmean(latencies) / 1000:8.2f} us"
+          f"   p50 {statistics.median(latencies) / 1000:8.2f} us   p99 {p99 / 1000:8.2f} us")
+
+def benchmark_logging_latency(n_threads=8, records_per_thread=20000):
+    """Compares per-call logging latency of the sync and queue-based setups."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup_sync_logging(os.path.join(tmp_dir, "sync.log"), console=False)
+        _report("sync FileHandler", _log_from_threads(n_threads, records_per_thread))
+
+        for overflow in OVERFLOW_POLICIES:
+            queue_handler, listener = setup_async_logging(
+                os.path.join(tmp_dir, f"{overflow}.log"), console=False, overflow=overflow)
+            latencies = _log_from_threads(n_threads, records_per_thread)
+            listener.stop()
+            _report(f"async ({overflow})", latencies)
+            if queue_handler.dropped:
+                print(f"{'':<28} dropped {queue_handler.dropped} records")
+        logging.shutdown()
+
+def benchmark_log_formats(records=200000):
+    """Compares write cost and ERROR-filter speed of the text, JSON-lines and binary formats."""
+    bench_logger = logging.getLogger("Benchmark")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sinks = {
+            "text": (BufferedFileHandler(os.path.join(tmp_dir, "app.log")), logging.Formatter(LOG_FORMAT)),
+            "jsonl": (BufferedFileHandler(os.path.join(tmp_dir, "app.jsonl")), JsonLinesFormatter()),
+            "binary": (BinaryLogHandler(os.path.join(tmp_dir, "app.bin")), None),
+        }
+        for label, (handler, formatter) in sinks.items():
+            if formatter:
+                handler.setFormatter(formatter)
+            logging.basicConfig(level=logging.DEBUG, handlers=[handler], force=True)
+            start = time.perf_counter()
+            for i in range(records):
+                bench_logger.log(logging.ERROR if i % 100 == 0 else logging.INFO, "record %d", i)
+            handler.force_flush()
+            write_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            if label == "text":
+                with open(handler.baseFilename, 'rb') as file:
+                    matches = sum(1 for line in file if b" - ERROR - " in line)
+            elif label == "jsonl":
+                matches = sum(1 for _ in read_json_log(handler.baseFilename, logging.ERROR))
+            else:
+                matches = sum(1 for _ in read_binary_log(handler.baseFilename, logging.ERROR))
+            read_s = time.perf_counter() - start
+            print(f"{label:<8} write {write_s:6.2f}s   filter ERROR {read_s:6.2f}s ({matches} records)"
+                  f"   size {os.path.getsize(handler.baseFilename) / 1e6:6.1f} MB")
+        logging.shutdown()
+
 # Example usage
 if __name__ == "__main__":
     log_messages()
     print(f"Logs have been saved to {LOG_FILE}")
+
+    # queue_handler, listener = setup_async_logging(overflow="drop_debug_first")
+    # log_messages()
+    # listener.stop()
+
+    # sink = RotatingCompressingFileHandler(LOG_FILE, max_bytes=50 * 1024 * 1024, interval=3600,
+    #                                       backup_count=48, max_age=7 * 24 * 3600)
+    # queue_handler, listener = setup_async_logging(file_handler=sink)
+    # print(segments_in_window(LOG_FILE, start=time.time() - 3600))
+
+    # queue_handler, listener = setup_async_logging("logs/app.jsonl", formatter=JsonLinesFormatter())
+    # queue_handler, listener = setup_async_logging(file_handler=BinaryLogHandler("logs/app.bin"))
+    # for record in read_binary_log("logs/app.bin", min_level=logging.ERROR):
+    #     print(record["level"], record["msg"])
+
+    # benchmark_logging_latency(n_threads=8, records_per_thread=20000)
+    # benchmark_log_formats(records=200000)
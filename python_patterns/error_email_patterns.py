@@ -1,16 +1,34 @@
+import glob
+import hashlib
+import json
 import logging
-import smtplib
 import os
+import queue
+import re
+import smtplib
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
+from structured_log_format import (COMPRESSED_SUFFIXES, format_record, open_structured_log,
+                                   read_binary_log, read_json_log)
+
 """
 This script provides a pattern for monitoring log messages and sending email alerts
 for critical errors and failed jobs.
 
 Key Features:
 - Configuring logging to capture critical errors
+- Streaming large log files in fixed-size chunks with bounded memory
+- Incrementally scanning only newly appended log data between runs
+- Exact level filtering of structured (JSON-lines / binary) logs
+- Classifying errors into configurable categories with one compiled regex
+- Scanning rotated (and gzip/zstd-compressed) log sets in parallel with a process pool
 - Sending email alerts for issues detected in log files
+- Dispatching alerts as batched, deduplicated, rate-limited digests
 - Customizing email content with error summaries
 """
 
@@ -27,29 +45,428 @@ logging.basicConfig(
 logger = logging.getLogger("ErrorMonitor")
 
 # 2. Function to Check Logs for Critical Errors
-def check_logs_for_errors(log_file):
-    """Scans the log file for critical errors and returns a summary."""
+CHUNK_SIZE = 1024 * 1024  # Bytes read per chunk while streaming a log
+MAX_ERROR_LINES = 1000  # Most recent matching lines kept in memory
+ERROR_LEVELS = ("CRITICAL", "ERROR")
+
+class LogScanSummary:
+    """Per-level counts plus a ring buffer of the most recent matching lines."""
+    def __init__(self, max_lines=MAX_ERROR_LINES):
+        self.counts = {level: 0 for level in ERROR_LEVELS}
+        self.recent = deque(maxlen=max_lines)
+        self.lines_scanned = 0
+        self.bytes_scanned = 0
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def add(self, level, line):
+        self.counts[level] += 1
+        self.recent.append(line)
+
+    def merge(self, other):
+        """Folds a summary of later log data into this one."""
+        for level, count in other.counts.items():
+            self.counts[level] += count
+        self.recent.extend(other.recent)
+        self.lines_scanned += other.lines_scanned
+        self.bytes_scanned += other.bytes_scanned
+        return self
+
+    def __str__(self):
+        if not self.total:
+            return "No critical errors detected."
+        dropped = self.total - len(self.recent)
+        header = f"... {dropped} earlier error lines omitted ...\n" if dropped else ""
+        return header + "\n".join(self.recent)
+
+def open_log(log_file):
+    """Opens a plain, gzipped (.gz) or zstd (.zst) log file for binary reading."""
+    return open_structured_log(log_file)
+
+def iter_log_buffers(log_file, chunk_size=CHUNK_SIZE, start=0, include_partial=True, end=None):
+    """Yields roughly chunk_size byte buffers that always end on a line boundary.
+
+    Reading covers bytes [start, end) of the file (end=None reads to EOF). With
+    include_partial=False a final line that has no trailing newline yet (still
+    being written) is not yielded.
+    """
+    with open_log(log_file) as file:
+        if start and file.seekable():
+            file.seek(start)
+        elif start:  # zstd streams only read forward
+            skipped = 0
+            while skipped < start and (data := file.read(min(chunk_size, start - skipped))):
+                skipped += len(data)
+        remaining = None if end is None else end - start
+        remainder = b""
+        while remaining is None or remaining > 0:
+            chunk = file.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            buffer = remainder + chunk
+            cut = buffer.rfind(b"\n") + 1
+            remainder = buffer[cut:]  # May be a line split across chunks
+            if cut:
+                yield buffer[:cut]
+        if remainder and include_partial:
+            yield remainder
+
+def iter_log_lines(log_file, chunk_size=CHUNK_SIZE, start=0, include_partial=True):
+    """Yields raw byte lines (without the newline) from the log file."""
+    for buffer in iter_log_buffers(log_file, chunk_size, start, include_partial):
+        lines = buffer.split(b"\n")
+        if buffer.endswith(b"\n"):
+            lines.pop()
+        yield from lines
+
+def match_error_level(line):
+    """Returns the first error level found in a raw byte line, or None."""
+    for level in ERROR_LEVELS:
+        if level.encode() in line:
+            return level
+    return None
+
+def iter_error_lines(log_file, chunk_size=CHUNK_SIZE):
+    """Yields (level, line) pairs for every ERROR/CRITICAL line in the log."""
+    for raw in iter_log_lines(log_file, chunk_size):
+        level = match_error_level(raw)
+        if level:
+            yield level, raw.decode('utf-8', errors='replace').rstrip("\r")
+
+def scan_log_for_errors(log_file, max_lines=MAX_ERROR_LINES, chunk_size=CHUNK_SIZE,
+                        start=0, include_partial=True):
+    """Streams the log file and returns a LogScanSummary using flat memory."""
+    summary = LogScanSummary(max_lines)
+    for raw in iter_log_lines(log_file, chunk_size, start, include_partial):
+        summary.lines_scanned += 1
+        summary.bytes_scanned += len(raw) + 1  # Includes the newline
+        level = match_error_level(raw)
+        if level:
+            summary.add(level, raw.decode('utf-8', errors='replace').rstrip("\r"))
+    return summary
+
+# Multi-pattern classification: every category is compiled into one regex
+# alternation of named groups, so each buffer is searched in a single C-level
+# pass no matter how many categories are configured.
+DEFAULT_ERROR_CATEGORIES = {
+    "critical": r"CRITICAL",
+    "error": r"ERROR",
+    "timeout": r"(?i:timed? ?out\b|TimeoutError)",
+    "oom": r"(?i:out of memory|MemoryError|oom-killer|Killed process)",
+    "database": r"(?i:OperationalError|IntegrityError|deadlock detected|connection refused)",
+    "job_failure": r"(?i:job \S+ failed|task failed|Traceback \(most recent call last\))",
+}
+MAX_CATEGORY_SAMPLES = 20  # Most recent sample lines kept per category
+
+class ErrorCategorySummary:
+    """Per-category line counts plus a ring buffer of sample lines for each."""
+    def __init__(self, categories, max_samples=MAX_CATEGORY_SAMPLES):
+        self.counts = {name: 0 for name in categories}
+        self.samples = {name: deque(maxlen=max_samples) for name in categories}
+        self.lines_scanned = 0
+        self.bytes_scanned = 0
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def merge(self, other):
+        """Folds a summary of later log data into this one."""
+        for name, count in other.counts.items():
+            self.counts[name] = self.counts.get(name, 0) + count
+            self.samples.setdefault(name, deque(maxlen=other.samples[name].maxlen))
+            self.samples[name].extend(other.samples[name])
+        self.lines_scanned += other.lines_scanned
+        self.bytes_scanned += other.bytes_scanned
+        return self
+
+    def __str__(self):
+        if not self.total:
+            return "No critical errors detected."
+        parts = []
+        for name, count in self.counts.items():
+            if count:
+                parts.append(f"[{name}] {count} lines")
+                parts.extend(f"  {line}" for line in self.samples[name])
+        return "\n".join(parts)
+
+class ErrorClassifier:
+    """Classifies log lines into configurable categories in one pass per buffer.
+
+    `categories` maps a category name (a valid identifier) to a regex. A line
+    is counted once for every category found in it; when two patterns match at
+    the same position, the one listed first wins.
+    """
+    def __init__(self, categories=None, max_samples=MAX_CATEGORY_SAMPLES):
+        self.categories = dict(categories or DEFAULT_ERROR_CATEGORIES)
+        self.max_samples = max_samples
+        for name in self.categories:
+            if not name.isidentifier():
+                raise ValueError(f"Category name must be an identifier: {name!r}")
+        self.pattern = re.compile("|".join(
+            f"(?P<{name}>{regex})" for name, regex in self.categories.items()
+        ).encode())
+
+    def new_summary(self):
+        return ErrorCategorySummary(self.categories, self.max_samples)
+
+    def classify_buffer(self, buffer, summary):
+        """Adds every match in a buffer of whole lines to the summary."""
+        summary.lines_scanned += buffer.count(b"\n") + (not buffer.endswith(b"\n"))
+        summary.bytes_scanned += len(buffer)
+        line_start = -1
+        seen = set()
+        for match in self.pattern.finditer(buffer):
+            start = buffer.rfind(b"\n", 0, match.start()) + 1
+            if start != line_start:
+                line_start, seen = start, set()
+            name = match.lastgroup
+            if name in seen:
+                continue
+            seen.add(name)
+            end = buffer.find(b"\n", match.end())
+            line = buffer[start:end if end != -1 else len(buffer)]
+            summary.counts[name] += 1
+            summary.samples[name].append(line.decode('utf-8', errors='replace').rstrip("\r"))
+        return summary
+
+    def classify_file(self, log_file, chunk_size=CHUNK_SIZE, start=0, include_partial=True,
+                      end=None):
+        """Streams the log file and returns an ErrorCategorySummary."""
+        summary = self.new_summary()
+        for buffer in iter_log_buffers(log_file, chunk_size, start, include_partial, end):
+            self.classify_buffer(buffer, summary)
+        return summary
+
+def classify_log_errors(log_file, categories=None, max_samples=MAX_CATEGORY_SAMPLES):
+    """Returns per-category counts and samples for the log file."""
+    return ErrorClassifier(categories, max_samples).classify_file(log_file)
+
+# Structured logs (written by basic_logging_config.py's JsonLinesFormatter or
+# BinaryLogHandler) carry the level as a field, so filtering is an exact
+# lookup instead of a substring search over the message text. The formats and
+# their readers are shared through structured_log_format.py.
+LOG_FORMATS = ("text", "jsonl", "binary")
+STRUCTURED_READERS = {"jsonl": read_json_log, "binary": read_binary_log}
+
+def iter_structured_errors(log_file, log_format, min_level=logging.ERROR):
+    """Yields (level, line) pairs for records with levelno >= min_level."""
+    if log_format not in STRUCTURED_READERS:
+        raise ValueError(f"log_format must be one of {LOG_FORMATS}, got {log_format!r}")
+    for record in STRUCTURED_READERS[log_format](log_file, min_level):
+        yield logging.getLevelName(record["levelno"]), format_record(record)
+
+def scan_structured_log_for_errors(log_file, log_format, max_lines=MAX_ERROR_LINES,
+                                   min_level=logging.ERROR):
+    """Returns a LogScanSummary for a JSON-lines or binary log, filtering on the level field."""
+    summary = LogScanSummary(max_lines)
+    for level, line in iter_structured_errors(log_file, log_format, min_level):
+        summary.counts[level] = summary.counts.get(level, 0) + 1
+        summary.recent.append(line)
+    return summary
+
+def check_logs_for_errors(log_file, max_lines=MAX_ERROR_LINES, categories=None, log_format="text"):
+    """Scans the log file for critical errors and returns a summary.
+
+    Pass `categories` (name -> regex) to get a per-category report instead of
+    the plain list of ERROR/CRITICAL lines, or log_format="jsonl"/"binary" for
+    structured logs.
+    """
     if not os.path.exists(log_file):
         return "No log file found."
-    
-    with open(log_file, 'r') as file:
-        lines = file.readlines()
-    
-    error_messages = [line for line in lines if "CRITICAL" in line or "ERROR" in line]
-    return "\n".join(error_messages) if error_messages else "No critical errors detected."
-
-# 3. Function to Send Email Alerts
-def send_email_alert(subject, body, recipient_email, sender_email, sender_password):
-    """Sends an email with the provided subject and body."""
+
+    if log_format != "text":
+        return str(scan_structured_log_for_errors(log_file, log_format, max_lines))
+    if categories is not None:
+        return str(classify_log_errors(log_file, categories, max_lines))
+    return str(scan_log_for_errors(log_file, max_lines))
+
+# 3. Incremental Scanning (only bytes appended since the last run)
+def load_scan_state(state_file):
+    """Loads the saved {"inode", "offset"} state, or an empty dict."""
+    try:
+        with open(state_file, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+def save_scan_state(state_file, state):
+    """Atomically writes the scan state so a crash never leaves it half-written."""
+    tmp_file = state_file + ".tmp"
+    with open(tmp_file, 'w') as file:
+        json.dump(state, file)
+    os.replace(tmp_file, state_file)
+
+HEAD_SIGNATURE_SIZE = 1024  # Leading bytes hashed to recognise a rotated file
+
+def _head_signature(log_file, size=HEAD_SIGNATURE_SIZE):
+    """Returns (sha1 hex, length) of the first `size` decompressed bytes of a log."""
+    with open_log(log_file) as file:
+        head = file.read(size)
+    return hashlib.sha1(head).hexdigest(), len(head)
+
+def _find_rotated_file(log_file, state):
+    """Finds the file the previous scan was reading before `log_file` was rotated.
+
+    A plain "<log_file>.1" (or an in-flight "<log_file>.rotating-*" segment of a
+    RotatingCompressingFileHandler) keeps the old inode. Once compressed to
+    ".1.gz"/".1.zst" it gets a new inode, so it is recognised by the hash of its
+    first bytes instead; decompressed, its offsets match the old file's.
+    """
+    candidates = [log_file + ".1"] + glob.glob(glob.escape(log_file) + ".rotating-*")
+    candidates += [log_file + ".1" + suffix for suffix in COMPRESSED_SUFFIXES]
+    for candidate in candidates:
+        if not os.path.isfile(candidate):
+            continue
+        if os.stat(candidate).st_ino == state["inode"]:
+            return candidate
+        head_len = state.get("head_len", 0)
+        try:
+            if head_len and _head_signature(candidate, head_len) == (state.get("head"), head_len):
+                return candidate
+        except (ImportError, OSError, EOFError):
+            continue  # zstandard missing, or a segment still being written
+    return None
+
+def scan_new_log_errors(log_file, state_file=None, max_lines=MAX_ERROR_LINES):
+    """Scans only the lines appended since the previous call.
+
+    The byte offset, inode and a hash of the first bytes of the log are kept in
+    `state_file` (defaults to "<log_file>.offset"). If the inode or the hash
+    changed the log was rotated or rewritten in place: the rest of the old file
+    is finished from "<log_file>.1", an in-flight "<log_file>.rotating-*"
+    segment or "<log_file>.1.gz"/".1.zst" (see _find_rotated_file), then the
+    new file is scanned from the start. Only
+    the most recent rotation is followed; segments rotated out in between are
+    skipped. If the file shrank it was truncated and is rescanned from byte 0.
+    """
+    state_file = state_file or log_file + ".offset"
+    if not os.path.exists(log_file):
+        return LogScanSummary(max_lines)
+
+    state = load_scan_state(state_file)
+    file_stat = os.stat(log_file)
+    offset = state.get("offset", 0)
+    summary = LogScanSummary(max_lines)
+
+    rotated = state.get("inode", file_stat.st_ino) != file_stat.st_ino
+    head_len = state.get("head_len", 0)
+    if not rotated and head_len:
+        # Same inode but different leading bytes: the log was rewritten in place
+        # (copytruncate) or deleted and recreated with its inode reused
+        rotated = _head_signature(log_file, head_len) != (state.get("head"), head_len)
+
+    if rotated:
+        rotated_file = _find_rotated_file(log_file, state)
+        if rotated_file:
+            summary = scan_log_for_errors(rotated_file, max_lines, start=offset)
+            summary.bytes_scanned = 0  # Offset below refers to the new file
+        offset = 0
+    elif file_stat.st_size < offset:
+        offset = 0
+
+    new = scan_log_for_errors(log_file, max_lines, start=offset, include_partial=False)
+    summary.merge(new)
+
+    head, head_len = _head_signature(log_file)
+    save_scan_state(state_file, {"inode": file_stat.st_ino, "offset": offset + new.bytes_scanned,
+                                 "head": head, "head_len": head_len})
+    return summary
+
+# 4. Parallel Scanning of Rotated Log Sets
+SPLIT_SIZE = 256 * 1024 * 1024  # Plain files larger than this are split into byte ranges
+
+def _rotation_key(path):
+    """Sorts app.log.50 ... app.log.1, app.log oldest first (.gz/.zst suffix ignored)."""
+    name = os.path.basename(path)
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    base, _, suffix = name.rpartition(".")
+    if suffix.isdigit():
+        return (base, -int(suffix))
+    return (name, 0)
+
+def find_log_files(path):
+    """Expands a directory, glob pattern or single path into log files, oldest first."""
+    if os.path.isdir(path):
+        path = os.path.join(path, "*.log*")
+    # Skip scanner state, temp files, index sidecars and segments a
+    # RotatingCompressingFileHandler is still compressing (app.log.rotating-*)
+    files = [f for f in glob.glob(path) if os.path.isfile(f)
+             and not f.endswith((".offset", ".tmp", ".json")) and ".rotating-" not in os.path.basename(f)]
+    return sorted(files, key=_rotation_key)
+
+def split_log_ranges(log_file, split_size=SPLIT_SIZE):
+    """Splits a plain log file into (start, end) byte ranges aligned to line starts."""
+    size = os.path.getsize(log_file)
+    if log_file.endswith(COMPRESSED_SUFFIXES) or size <= split_size:
+        return [(0, None)]
+    boundaries = [0]
+    with open(log_file, 'rb') as file:
+        while boundaries[-1] + split_size < size:
+            file.seek(boundaries[-1] + split_size)
+            file.readline()  # Move the cut to the start of the next line
+            if file.tell() >= size:
+                break
+            boundaries.append(file.tell())
+    boundaries.append(None)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+def _classify_range(task):
+    """Worker entry point: classifies one (file, start, end) range."""
+    log_file, start, end, categories, max_samples = task
+    classifier = ErrorClassifier(categories, max_samples)
+    return classifier.classify_file(log_file, start=start, end=end)
+
+def scan_logs_parallel(path, categories=None, max_samples=MAX_CATEGORY_SAMPLES,
+                       workers=None, split_size=SPLIT_SIZE):
+    """Classifies a whole rotation set across a process pool.
+
+    `path` is a directory, a glob pattern (e.g. "logs/app.log*") or a list of
+    files. Large plain files are split into line-aligned byte ranges, compressed
+    files are streamed whole, and the per-range summaries are merged in file
+    order so the kept samples are the most recent ones.
+    """
+    files = path if isinstance(path, (list, tuple)) else find_log_files(path)
+    categories = dict(categories or DEFAULT_ERROR_CATEGORIES)
+    tasks = [
+        (log_file, start, end, categories, max_samples)
+        for log_file in files
+        for start, end in split_log_ranges(log_file, split_size)
+    ]
+    summary = ErrorClassifier(categories, max_samples).new_summary()
+    if not tasks:
+        return summary
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for partial in executor.map(_classify_range, tasks):
+            summary.merge(partial)
+    return summary
+
+# 5. Function to Send Email Alerts
+SMTP_HOST = 'smtp.gmail.com'
+SMTP_PORT = 587
+
+def build_alert_message(subject, body, recipient_email, sender_email):
+    """Builds the MIME message for an alert email."""
     msg = MIMEMultipart()
     msg['From'] = sender_email
     msg['To'] = recipient_email
     msg['Subject'] = subject
-    
+
     msg.attach(MIMEText(body, 'plain'))
-    
+    return msg
+
+def send_email_alert(subject, body, recipient_email, sender_email, sender_password):
+    """Sends an email with the provided subject and body."""
+    msg = build_alert_message(subject, body, recipient_email, sender_email)
+
     try:
-        with smtplib.SMTP('smtp.gmail.com', 587) as server:
+        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
             server.starttls()
             server.login(sender_email, sender_password)
             server.sendmail(sender_email, recipient_email, msg.as_string())
@@ -57,12 +474,210 @@ def send_email_alert(subject, body, recipient_email, sender_email, sender_passwo
     except Exception as e:
         print(f"Error sending email: {e}")
 
-# 4. Example Usage (Uncomment to run)
+# 6. Batched, Rate-Limited Alert Dispatcher
+# Alerts are queued without blocking the caller. A background thread coalesces
+# everything raised inside `window` seconds into one digest, collapses alerts
+# with the same signature, and sends digests over one reused SMTP session at a
+# rate bounded by a token bucket.
+class TokenBucket:
+    """Allows `rate` sends per second with bursts of up to `capacity`."""
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def wait_time(self):
+        """Seconds until a token is available (0 if one is available now)."""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def try_acquire(self):
+        if self.wait_time() == 0.0:
+            self.tokens -= 1
+            return True
+        return False
+
+_VOLATILE_TOKENS = re.compile(r"0x[0-9a-fA-F]+|\d+")
+
+def alert_signature(subject, body):
+    """Identifies an alert with numbers, ids and timestamps masked out."""
+    text = _VOLATILE_TOKENS.sub("#", f"{subject}\n{body}")
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+class AlertDispatcher:
+    """Queues alerts and sends them as rate-limited digest emails in the background."""
+    _STOP = object()
+
+    def __init__(self, recipient_email, sender_email, sender_password=None,
+                 host=SMTP_HOST, port=SMTP_PORT, use_tls=True, window=30.0,
+                 rate=1 / 60, burst=5, max_queue=10000, timeout=30):
+        self.recipient_email = recipient_email
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self.host = host
+        self.port = port
+        self.use_tls = use_tls
+        self.window = window
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, burst)
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.stats = {"queued": 0, "dropped": 0, "duplicates": 0, "sent": 0, "failed": 0}
+        self._server = None
+        self._thread = threading.Thread(target=self._run, name="AlertDispatcher", daemon=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def alert(self, subject, body):
+        """Queues an alert without blocking; returns False if the queue is full."""
+        try:
+            self.queue.put_nowait((subject, body))
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return False
+        self.stats["queued"] += 1
+        return True
+
+    def close(self, timeout=None):
+        """Flushes pending alerts, stops the worker and closes the SMTP session."""
+        self.queue.put(self._STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        pending = {}  # signature -> [subject, body, count], in arrival order
+        deadline = None
+        while True:
+            timeout = None
+            if pending:
+                timeout = max(deadline - time.monotonic(), self.bucket.wait_time(), 0)
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is self._STOP:
+                break
+            if item is not None:
+                subject, body = item
+                signature = alert_signature(subject, body)
+                if signature in pending:
+                    pending[signature][2] += 1
+                    self.stats["duplicates"] += 1
+                else:
+                    pending[signature] = [subject, body, 1]
+                if deadline is None:
+                    deadline = time.monotonic() + self.window
+            elif time.monotonic() >= deadline and self.bucket.try_acquire():
+                self._send_digest(list(pending.values()))
+                pending, deadline = {}, None
+        if pending:  # Final flush on shutdown is not held back by the rate limit
+            self._send_digest(list(pending.values()))
+        self._disconnect()
+
+    def _send_digest(self, alerts):
+        total = sum(count for _, _, count in alerts)
+        if len(alerts) == 1:
+            subject = alerts[0][0] if total == 1 else f"{alerts[0][0]} (x{total})"
+        else:
+            subject = f"Log Alert Digest: {total} alerts ({len(alerts)} distinct)"
+        sections = []
+        for alert_subject, body, count in alerts:
+            suffix = f" (x{count})" if count > 1 else ""
+            sections.append(f"== {alert_subject}{suffix} ==\n{body}")
+        msg = build_alert_message(subject, "\n\n".join(sections), self.recipient_email, self.sender_email)
+        self._send(msg)
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.sender_password:
+                server.login(self.sender_email, self.sender_password)
+        except BaseException:
+            server.close()  # Don't leak the socket of a half-set-up session
+            raise
+        self._server = server
+
+    def _disconnect(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+    def _drop_session(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    def _send(self, msg):
+        """Sends over the cached session, reconnecting once if it went stale."""
+        for _ in range(2):
+            try:
+                if self._server is None:
+                    self._connect()
+                self._server.sendmail(self.sender_email, self.recipient_email, msg.as_string())
+                self.stats["sent"] += 1
+                return
+            except smtplib.SMTPServerDisconnected as e:
+                self._drop_session()
+                error = e
+            except smtplib.SMTPException as e:
+                # Auth failures, refused recipients, data errors: reconnecting won't help.
+                # (Checked before OSError, which SMTPException subclasses.)
+                error = e
+                break
+            except OSError as e:  # Socket-level failure: the session is unusable
+                self._drop_session()
+                error = e
+        self.stats["failed"] += 1
+        print(f"Error sending alert digest: {error}")
+
+# 7. Example Usage (Uncomment to run)
 # logger.info("This is an info message")
 # logger.error("This is an error message")
 # logger.critical("This is a critical error!")
 
+# summary = scan_log_for_errors(LOG_FILE, max_lines=50)
+# print(summary.counts, summary.lines_scanned)
+# for level, line in iter_error_lines(LOG_FILE):
+#     print(level, line)
+
+# new_errors = scan_new_log_errors(LOG_FILE)  # e.g. from a cron job every minute
+# print(new_errors)
+
+# structured = scan_structured_log_for_errors("logs/app.jsonl", "jsonl")
+# print(structured.counts)
+
+# categories = dict(DEFAULT_ERROR_CATEGORIES, disk_full=r"No space left on device")
+# by_category = classify_log_errors(LOG_FILE, categories)
+# print(by_category.counts)
+
+# rotation_summary = scan_logs_parallel("logs/app.log*", workers=8)
+# print(rotation_summary.counts)
+
 # error_summary = check_logs_for_errors(LOG_FILE)
 # if "CRITICAL" in error_summary or "ERROR" in error_summary:
 #     send_email_alert("Log Alert: Critical Errors Detected", error_summary, "recipient@example.com", "your_email@gmail.com", "your_password")
 
+# Local testing against a debugging SMTP server (python -m aiosmtpd -n -l localhost:8025):
+# with AlertDispatcher("recipient@example.com", "monitor@example.com", host="localhost", port=8025,
+#                      use_tls=False, window=5) as dispatcher:
+#     for line in iter_error_lines(LOG_FILE):
+#         dispatcher.alert("Log Alert", line[1])
+
@@ -1,12 +1,37 @@
+import codecs
+import csv
+import errno
+import mmap
 import os
+import re
 import shutil
+import sqlite3
+import sys
 import pathlib
 import tempfile
+import threading
+import time
 import zipfile
+import zlib
 import fileinput
+import fnmatch
+import io
+import itertools
+import math
+from array import array
+from collections import deque, namedtuple
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor,
+                                as_completed, wait)
+
+try:
+    import numpy as np  # Optional: typed CSV columns as NumPy arrays (see 17)
+except ImportError:
+    np = None
 
 # 1. Retrieve file properties
-def get_file_properties(file_path):
+def get_file_properties(file_path, index=None):
+    if index is not None:
+        return index.get_file_properties(file_path)  # Answered from a FileIndex (see 13)
     file_stat = os.stat(file_path)
     return {
         "size": file_stat.st_size,
@@ -20,7 +45,9 @@ def create_directory(dir_path):
     print(f"Directory {dir_path} created")
 
 # 3. Match patterns in filenames
-def match_pattern(directory, pattern):
+def match_pattern(directory, pattern, index=None):
+    if index is not None:
+        return index.match_pattern(directory, pattern)
     return list(pathlib.Path(directory).glob(pattern))
 
 # 4. Traverse directory trees
@@ -56,11 +83,24 @@ def delete_directory(dir_path):
 
 # 7. Copy, move, or rename files and directories
 def copy_file(src, dest):
-    shutil.copy2(src, dest)
+    if os.path.isdir(dest):
+        dest = os.path.join(dest, os.path.basename(src))
+    fast_copy_file(src, dest)  # shutil.copy2 semantics, zero-copy where possible (see 15)
     print(f"Copied {src} to {dest}")
 
 def move_file(src, dest):
-    shutil.move(src, dest)
+    if os.path.isdir(dest):
+        dest = os.path.join(dest, os.path.basename(src))
+    try:
+        os.replace(src, dest)  # Same filesystem: just a rename
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        if os.path.isdir(src):
+            shutil.move(src, dest)
+        else:
+            fast_copy_file(src, dest)
+            os.remove(src)
     print(f"Moved {src} to {dest}")
 
 def rename_file(src, dest):
@@ -86,7 +126,16 @@ def read_multiple_files(files):
             print(line, end='')
 
 # 10. Read and write text files
-def read_text_file(file_path):
+TEXT_READ_MODES = ("lines", "mmap", "chunks")
+
+def read_text_file(file_path, mode="lines"):
+    # "mmap" and "chunks" return lazy iterators for files too large for readlines (see 16)
+    if mode not in TEXT_READ_MODES:
+        raise ValueError(f"mode must be one of {TEXT_READ_MODES}, got {mode!r}")
+    if mode == "mmap":
+        return iter_lines_mmap(file_path)
+    if mode == "chunks":
+        return read_text_chunks(file_path)
     with open(file_path, 'r') as file:
         return file.readlines()
 
@@ -108,6 +157,855 @@ def write_csv_file(file_path, data):
         writer.writerows(data)
     print(f"CSV file written: {file_path}")
 
+# 12. Walk large directory trees (scandir-based, optionally threaded)
+FileEntry = namedtuple("FileEntry", ["path", "name", "is_dir", "size", "mtime", "depth"])
+
+def _matches(name, patterns):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+def _scan_dir(path, depth, include, exclude, max_depth, follow_symlinks):
+    """Scans one directory; returns (entries to yield, subdirectories to descend into)."""
+    entries, subdirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if exclude and _matches(entry.name, exclude):
+                    continue
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=follow_symlinks)
+                    stat = entry.stat(follow_symlinks=follow_symlinks)  # Cached on the DirEntry
+                except OSError:
+                    continue  # Vanished or unreadable while walking
+                if is_dir and (max_depth is None or depth < max_depth):
+                    subdirs.append(entry.path)
+                if not include or _matches(entry.name, include):
+                    entries.append(FileEntry(entry.path, entry.name, is_dir, stat.st_size,
+                                             stat.st_mtime, depth))
+    except OSError as e:
+        print(f"Skipping {path}: {e}")
+    return entries, subdirs
+
+def walk_directory(root_dir, include=None, exclude=None, max_depth=None, workers=0,
+                   follow_symlinks=False):
+    """Yields a FileEntry for every file and directory under root_dir.
+
+    include/exclude are fnmatch patterns on the entry name; an excluded
+    directory is not descended into. Entries directly in root_dir have depth 0
+    and max_depth limits how deep the walk goes. With workers > 0 sibling
+    directories are scanned concurrently on a thread pool, which hides the
+    per-call latency of stat on network filesystems (entries then arrive in
+    completion order rather than tree order).
+    """
+    include = [include] if isinstance(include, str) else include
+    exclude = [exclude] if isinstance(exclude, str) else exclude
+    options = (include, exclude, max_depth, follow_symlinks)
+
+    if not workers:
+        stack = [(root_dir, 0)]
+        while stack:
+            path, depth = stack.pop()
+            entries, subdirs = _scan_dir(path, depth, *options)
+            yield from entries
+            stack.extend((subdir, depth + 1) for subdir in reversed(subdirs))
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(_scan_dir, root_dir, 0, *options): 0}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                depth = pending.pop(future)
+                entries, subdirs = future.result()
+                for subdir in subdirs:
+                    pending[executor.submit(_scan_dir, subdir, depth + 1, *options)] = depth + 1
+                yield from entries
+
+# 13. Persistent file-metadata index (SQLite) with incremental refresh
+# A directory's mtime only changes when entries are added, removed or renamed
+# in it, so refresh() stats every directory but only re-lists (and re-stats
+# the files of) directories whose mtime moved. In-place edits to a file in an
+# unchanged directory are picked up by refresh(full=True). Symlinks are
+# indexed as entries but never followed, so a symlinked directory's contents
+# are not in the index.
+class FileIndex:
+    """Answers get_file_properties / match_pattern queries for one tree from SQLite."""
+    def __init__(self, root_dir, db_path):
+        self.root = os.path.abspath(root_dir)
+        self.db_path = os.path.abspath(db_path)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                rel TEXT PRIMARY KEY,   -- path relative to root, '/'-separated ('' is root)
+                parent TEXT,
+                name TEXT NOT NULL,
+                depth INTEGER NOT NULL, -- 0 for entries directly in root
+                size INTEGER,
+                mtime REAL,
+                is_file INTEGER NOT NULL,
+                listed_mtime REAL       -- directories: mtime when last listed
+            );
+            CREATE INDEX IF NOT EXISTS entries_parent ON entries(parent);
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def _abs(self, rel):
+        return os.path.join(self.root, *rel.split("/")) if rel else self.root
+
+    def _rel(self, path):
+        rel = os.path.relpath(os.path.abspath(path), self.root)
+        if rel == os.curdir:
+            return ""
+        if rel.startswith(os.pardir):
+            raise ValueError(f"{path} is outside the indexed tree {self.root}")
+        return rel.replace(os.sep, "/")
+
+    def _delete_subtree(self, rel):
+        self.conn.execute("DELETE FROM entries WHERE rel = ? OR (rel >= ? AND rel < ?)",
+                          (rel, rel + "/", rel + "0"))  # '0' sorts right after '/'
+
+    def refresh(self, full=False):
+        """Brings the index up to date; returns the number of directories re-listed."""
+        listed = 0
+        with self.conn:
+            stack = [""]
+            while stack:
+                rel = stack.pop()
+                try:
+                    dir_mtime = os.stat(self._abs(rel)).st_mtime
+                except FileNotFoundError:
+                    self._delete_subtree(rel)
+                    continue
+                row = self.conn.execute("SELECT listed_mtime FROM entries WHERE rel = ?", (rel,)).fetchone()
+                if not full and row is not None and row[0] == dir_mtime:
+                    stack.extend(child for (child,) in self.conn.execute(
+                        "SELECT rel FROM entries WHERE parent = ? AND is_file = 0", (rel,)))
+                    continue
+                stack.extend(self._list_directory(rel, dir_mtime))
+                listed += 1
+        return listed
+
+    def _list_directory(self, rel, dir_mtime):
+        """Re-lists one directory into the index and returns its subdirectories."""
+        depth = rel.count("/") + 1 if rel else 0
+        rows, subdirs = [], []
+        try:
+            with os.scandir(self._abs(rel)) as it:
+                for entry in it:
+                    if entry.path == self.db_path or entry.path.startswith(self.db_path + "-"):
+                        continue  # Skip the index's own database / journal
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        stat = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    child = f"{rel}/{entry.name}" if rel else entry.name
+                    rows.append((child, rel, entry.name, depth, stat.st_size, stat.st_mtime, not is_dir))
+                    if is_dir:
+                        subdirs.append(child)
+        except OSError as e:
+            print(f"Skipping {self._abs(rel)}: {e}")
+            return []
+
+        present = {row[0] for row in rows}
+        for (child,) in self.conn.execute("SELECT rel FROM entries WHERE parent = ?", (rel,)).fetchall():
+            if child not in present:
+                self._delete_subtree(child)
+        self.conn.executemany("""
+            INSERT INTO entries (rel, parent, name, depth, size, mtime, is_file)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(rel) DO UPDATE SET size = excluded.size, mtime = excluded.mtime,
+                                           is_file = excluded.is_file
+        """, rows)
+        name = os.path.basename(self.root) if not rel else rel.rsplit("/", 1)[-1]
+        self.conn.execute("""
+            INSERT INTO entries (rel, parent, name, depth, mtime, is_file, listed_mtime)
+            VALUES (?, ?, ?, ?, ?, 0, ?)
+            ON CONFLICT(rel) DO UPDATE SET listed_mtime = excluded.listed_mtime
+        """, (rel, rel.rpartition("/")[0] if rel else None, name, depth - 1, dir_mtime, dir_mtime))
+        return subdirs
+
+    def get_file_properties(self, file_path):
+        row = self.conn.execute("SELECT size, mtime, is_file FROM entries WHERE rel = ?",
+                                (self._rel(file_path),)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"Not in index: {file_path}")
+        return {"size": row[0], "last_modified": row[1], "is_file": bool(row[2])}
+
+    def match_pattern(self, directory, pattern):
+        """Same results as pathlib.Path(directory).glob(pattern), from the index.
+
+        Except for symlinked directories: pathlib follows them, while here
+        they match like files (not "*/") and nothing below them matches.
+        """
+        base = self._rel(directory)
+        segments = [segment for segment in pattern.split("/") if segment not in ("", ".")]
+        # A trailing "/" (e.g. "*/") matches directories only, as in pathlib
+        regex, sql, params = _glob_query(segments, base, dirs_only=pattern.endswith("/"))
+        candidates = self.conn.execute(f"SELECT rel FROM entries WHERE {sql}", params)
+        matcher = re.compile(regex)
+        directory = pathlib.Path(directory)
+        prefix = len(base) + 1 if base else 0
+        return [directory / rel[prefix:] for (rel,) in candidates if matcher.fullmatch(rel)]
+
+def _set_end(segment, start):
+    """Index of the "]" closing the set opened at segment[start], or -1 (as in fnmatch).
+
+    A "]" right after "[" or "[!" is a member of the set, not its end.
+    """
+    i = start + 1
+    if segment[i:i + 1] == "!":
+        i += 1
+    if segment[i:i + 1] == "]":
+        i += 1
+    return segment.find("]", i)
+
+def _segment_regex(segment):
+    """Translates one glob path segment to a regex that never crosses '/'."""
+    out, i = [], 0
+    while i < len(segment):
+        char = segment[i]
+        if char == "*":
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "[" and _set_end(segment, i) != -1:
+            end = _set_end(segment, i)
+            body = segment[i + 1:end]
+            negate = body.startswith("!")
+            # Escape what re would read as syntax inside a set (as fnmatch does):
+            # backslashes, nested "[", set operators and a leading "^"
+            body = re.sub(r"([\\\[&~|^])", r"\\\1", body[1:] if negate else body)
+            out.append("[" + ("^" if negate else "") + body + "]")
+            i = end
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return "".join(out)
+
+def _sqlite_glob(segment):
+    """A SQLite GLOB matching a superset of the segment: every [...] set (or lone "[") becomes "?".
+
+    SQLite reads a leading "^" in a set as negation where glob reads it
+    literally, so sets are left to the regex.
+    """
+    out, i = [], 0
+    while i < len(segment):
+        if segment[i] == "[":
+            out.append("?")
+            if _set_end(segment, i) != -1:
+                i = _set_end(segment, i)
+        else:
+            out.append(segment[i])
+        i += 1
+    return "".join(out)
+
+def _glob_query(segments, base, dirs_only=False):
+    """Builds (regex, SQL filter, params) for a glob relative to the base directory."""
+    regex = re.escape(base) + "/" if base else ""
+    for position, segment in enumerate(segments):
+        last = position == len(segments) - 1
+        if segment == "**":
+            # Zero or more directories; a trailing ** matches directories only
+            if last:
+                regex = regex[:-1] + "(?:/[^/]+)*" if regex else "(?:[^/]+(?:/[^/]+)*)?"
+            else:
+                regex += "(?:[^/]+/)*"
+        else:
+            regex += _segment_regex(segment) + ("" if last else "/")
+
+    base_depth = base.count("/") + 1 if base else 0
+    fixed = len([segment for segment in segments if segment != "**"])
+    conditions = ["(rel = ? OR (rel >= ? AND rel < ?))" if base else "rel != ?"]
+    params = [base, base + "/", base + "0"] if base else [""]
+    if segments and segments[-1] == "**" and not base:
+        conditions, params = [], []  # The root itself matches a bare trailing **
+    if "**" in segments:
+        conditions.append("depth >= ?")
+        params.append(base_depth + fixed - 1)
+    else:
+        conditions.append("depth = ?")
+        params.append(base_depth + fixed - 1)
+    if segments and segments[-1] != "**":
+        conditions.append("name GLOB ?")
+        params.append(_sqlite_glob(segments[-1]))  # Narrow in SQLite, regex decides
+    if dirs_only or (segments and segments[-1] == "**"):
+        conditions.append("is_file = 0")
+    return regex, " AND ".join(conditions) or "1", params
+
+# 14. Parallel ZIP creation and extraction
+# zlib releases the GIL while compressing, so members are deflated on a thread
+# pool (each into a bounded spool file) and written into the archive in input
+# order. The result is a standard ZIP readable by any tool.
+ZIP_CHUNK_SIZE = 1024 * 1024
+ZIP_SPOOL_SIZE = 8 * 1024 * 1024  # Compressed bytes kept in RAM per member before spilling to disk
+INCOMPRESSIBLE_SUFFIXES = {".zip", ".gz", ".bz2", ".xz", ".zst", ".7z", ".jpg", ".jpeg", ".png",
+                           ".gif", ".webp", ".mp3", ".mp4", ".mkv", ".avi", ".mov", ".parquet"}
+
+def _is_incompressible(path, level):
+    """Checks the extension, then trial-compresses the first chunk."""
+    if pathlib.Path(path).suffix.lower() in INCOMPRESSIBLE_SUFFIXES:
+        return True
+    with open(path, 'rb') as file:
+        sample = file.read(64 * 1024)
+    return len(sample) > 1024 and len(zlib.compress(sample, level)) > len(sample) * 0.95
+
+def _compress_member(path, level):
+    """Returns (ZipInfo, spool or None). STORED members are copied later from the source."""
+    zinfo = zipfile.ZipInfo.from_file(path)
+    if zinfo.is_dir():
+        zinfo.compress_type = zipfile.ZIP_STORED
+        zinfo.CRC = zinfo.compress_size = zinfo.file_size = 0
+        return zinfo, None
+
+    crc, size = 0, 0
+    if level == 0 or _is_incompressible(path, level):
+        zinfo.compress_type = zipfile.ZIP_STORED
+        with open(path, 'rb') as file:
+            while chunk := file.read(ZIP_CHUNK_SIZE):
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+        zinfo.CRC, zinfo.file_size, zinfo.compress_size = crc, size, size
+        return zinfo, None
+
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)  # Raw deflate, as ZIP expects
+    spool = tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_SIZE)
+    with open(path, 'rb') as file:
+        while chunk := file.read(ZIP_CHUNK_SIZE):
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            spool.write(compressor.compress(chunk))
+    spool.write(compressor.flush())
+    zinfo.CRC, zinfo.file_size, zinfo.compress_size = crc, size, spool.tell()
+    spool.seek(0)
+    return zinfo, spool
+
+def _append_member(zipf, path, zinfo, spool):
+    """Writes a pre-compressed member (local header + data) into an open ZipFile."""
+    zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT or zinfo.compress_size > zipfile.ZIP64_LIMIT
+    zinfo.header_offset = zipf.fp.tell()
+    zipf.fp.write(zinfo.FileHeader(zip64))
+    if spool is not None:
+        shutil.copyfileobj(spool, zipf.fp, ZIP_CHUNK_SIZE)
+        spool.close()
+    elif zinfo.file_size:
+        with open(path, 'rb') as file:
+            shutil.copyfileobj(file, zipf.fp, ZIP_CHUNK_SIZE)
+    zipf.filelist.append(zinfo)
+    zipf.NameToInfo[zinfo.filename] = zinfo
+    zipf.start_dir = zipf.fp.tell()
+    zipf._didModify = True  # So close() writes the central directory
+
+def create_zip_parallel(zip_name, files, level=6, workers=None):
+    """Like create_zip, but deflates members concurrently; level=0 stores everything."""
+    workers = workers or os.cpu_count() or 1
+    with zipfile.ZipFile(zip_name, 'w') as zipf, ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for file in files:
+            pending.append((file, executor.submit(_compress_member, file, level)))
+            if len(pending) >= workers * 2:  # Bound the spools held at once
+                path, future = pending.popleft()
+                _append_member(zipf, path, *future.result())
+        while pending:
+            path, future = pending.popleft()
+            _append_member(zipf, path, *future.result())
+    print(f"Created ZIP archive: {zip_name}")
+
+def extract_zip_parallel(zip_name, extract_to, workers=None):
+    """Like extract_zip, but decompresses members concurrently (one ZipFile handle per thread)."""
+    local = threading.local()
+    handles = []
+
+    def extract(member):
+        if not hasattr(local, "zipf"):
+            local.zipf = zipfile.ZipFile(zip_name, 'r')
+            handles.append(local.zipf)
+        local.zipf.extract(member, extract_to)
+
+    with zipfile.ZipFile(zip_name, 'r') as zipf:
+        members = zipf.infolist()
+    # Create parent directories up front so threads never race on makedirs
+    for member in members:
+        parts = [part for part in member.filename.split("/") if part not in ("", ".", "..")]
+        os.makedirs(os.path.join(extract_to, *parts[:-1]), exist_ok=True)
+    # Largest first keeps the pool busy until the end
+    members.sort(key=lambda member: member.file_size, reverse=True)
+    try:
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            list(executor.map(extract, members))
+    finally:
+        for handle in handles:
+            handle.close()
+    print(f"Extracted {zip_name} to {extract_to}")
+
+# 15. Bulk copy/move engine with zero-copy fast paths
+# copy_file_range lets the kernel (or the filesystem: reflinks, NFS server-side
+# copy) move the bytes without passing them through user space; sendfile is the
+# older zero-copy path; a large-buffer copy is the portable fallback.
+COPY_BUFFER_SIZE = 4 * 1024 * 1024
+_ZERO_COPY_FALLBACK_ERRORS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+                              errno.ENOTSUP, errno.EBADF, errno.EPERM}
+
+def _zero_copy(fsrc, fdst, size, copy_func):
+    """Runs a kernel copy loop; returns False (with dest reset) if it is unsupported here."""
+    copied = 0
+    try:
+        while copied < size:
+            sent = copy_func(size - copied)
+            if sent == 0:
+                break
+            copied += sent
+        return True
+    except OSError as e:
+        if e.errno not in _ZERO_COPY_FALLBACK_ERRORS:
+            raise
+        fsrc.seek(0)
+        fdst.seek(0)
+        fdst.truncate()
+        return False
+
+def fast_copy_file(src, dest):
+    """Copies data and metadata like shutil.copy2, preferring kernel zero-copy paths."""
+    try:
+        if os.path.samefile(src, dest):  # Opening dest for writing would empty src
+            raise shutil.SameFileError(f"{src!r} and {dest!r} are the same file")
+    except FileNotFoundError:
+        pass
+    with open(src, 'rb') as fsrc, open(dest, 'wb') as fdst:
+        in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+        size = os.fstat(in_fd).st_size
+        done = hasattr(os, "copy_file_range") and _zero_copy(
+            fsrc, fdst, size, lambda count: os.copy_file_range(in_fd, out_fd, count))
+        if not done and hasattr(os, "sendfile"):
+            done = _zero_copy(fsrc, fdst, size, lambda count: os.sendfile(out_fd, in_fd, None, count))
+        if not done:
+            shutil.copyfileobj(fsrc, fdst, COPY_BUFFER_SIZE)
+    shutil.copystat(src, dest)
+    return size
+
+def _is_unchanged(src_stat, dest):
+    try:
+        dest_stat = os.stat(dest)
+    except FileNotFoundError:
+        return False
+    return (dest_stat.st_size == src_stat.st_size
+            and dest_stat.st_mtime_ns == src_stat.st_mtime_ns)  # copystat preserves mtime
+
+def _copy_one(src, dest, skip_unchanged):
+    src_stat = os.stat(src)
+    if skip_unchanged and _is_unchanged(src_stat, dest):
+        return "skipped", 0
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    return "copied", fast_copy_file(src, dest)
+
+def _move_one(src, dest, skip_unchanged):
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    try:
+        os.replace(src, dest)  # Same filesystem: a metadata-only rename
+        return "renamed", 0
+    except OSError as e:
+        if e.errno != errno.EXDEV or os.path.isdir(src):
+            raise
+    size = fast_copy_file(src, dest)
+    os.remove(src)
+    return "copied", size
+
+def _run_bulk(func, pairs, workers, skip_unchanged):
+    stats = {"copied": 0, "skipped": 0, "renamed": 0, "failed": 0, "bytes": 0, "errors": []}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(func, src, dest, skip_unchanged): (src, dest) for src, dest in pairs}
+        for future in as_completed(futures):
+            try:
+                outcome, size = future.result()
+            except OSError as e:
+                stats["failed"] += 1
+                stats["errors"].append((*futures[future], str(e)))
+                continue
+            stats[outcome] += 1
+            stats["bytes"] += size
+    stats["seconds"] = time.perf_counter() - start
+    stats["mb_per_s"] = stats["bytes"] / 1e6 / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+def copy_files(pairs, workers=16, skip_unchanged=True):
+    """Copies many (src, dest) pairs on a thread pool and returns aggregate stats.
+
+    Files whose dest already has the same size and mtime are skipped.
+    """
+    stats = _run_bulk(_copy_one, pairs, workers, skip_unchanged)
+    print(f"Copied {stats['copied']} files ({stats['bytes'] / 1e6:.1f} MB, "
+          f"{stats['mb_per_s']:.1f} MB/s), skipped {stats['skipped']}, failed {stats['failed']}")
+    return stats
+
+def move_files(pairs, workers=16):
+    """Moves many (src, dest) pairs: renames within a filesystem, copies across devices."""
+    stats = _run_bulk(_move_one, pairs, workers, False)
+    print(f"Moved {stats['renamed'] + stats['copied']} files ({stats['renamed']} renamed, "
+          f"{stats['copied']} copied across devices), failed {stats['failed']}")
+    return stats
+
+# 16. Memory-mapped and chunked readers for huge text files
+TEXT_CHUNK_SIZE = 4 * 1024 * 1024
+
+def _map_file(file):
+    """mmap a file for reading; returns None for empty files (which cannot be mapped)."""
+    if os.fstat(file.fileno()).st_size == 0:
+        return None
+    return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+def iter_lines_mmap(file_path, encoding='utf-8'):
+    """Lazily yields lines from a memory-mapped file.
+
+    Like readlines in text mode, lines keep their newline and "\r\n" / "\r"
+    line endings are translated to "\n".
+    """
+    with open(file_path, 'rb') as file:
+        mapped = _map_file(file)
+        if mapped is None:
+            return
+        with mapped:
+            start, size = 0, len(mapped)
+            while start < size:
+                end = mapped.find(b"\n", start)
+                end = size if end == -1 else end + 1
+                line = mapped[start:end]
+                if b"\r" in line:
+                    yield from line.decode(encoding).replace("\r\n", "\n").replace("\r", "\n") \
+                        .splitlines(keepends=True)
+                else:
+                    yield line.decode(encoding)
+                start = end
+
+def read_text_chunks(file_path, chunk_size=TEXT_CHUNK_SIZE, encoding='utf-8'):
+    """Yields large decoded text blocks; multi-byte characters split across reads are kept whole.
+
+    Line endings are translated to "\n" as in text mode, even when a "\r\n"
+    pair is split across reads.
+    """
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(), translate=True)
+    with open(file_path, 'rb') as file:
+        while chunk := file.read(chunk_size):
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+class LineIndex:
+    """Random access to line N of a large file through a lazily built, sparse offset index.
+
+    Only the byte offset of every `stride`-th line is stored, and only as far
+    into the file as has been requested so far; the few lines in between are
+    found with mmap.find.
+    """
+    def __init__(self, file_path, stride=1024, encoding='utf-8'):
+        self.encoding = encoding
+        self.stride = stride
+        self._file = open(file_path, 'rb')
+        self._mapped = _map_file(self._file)
+        self._size = len(self._mapped) if self._mapped is not None else 0
+        self._offsets = array('Q', [0])  # _offsets[k] = byte offset of line k * stride
+        self._complete = self._size == 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._mapped is not None:
+            self._mapped.close()
+        self._file.close()
+
+    def _next_line(self, offset):
+        end = self._mapped.find(b"\n", offset)
+        return self._size if end == -1 else end + 1
+
+    def _line_offset(self, line_number):
+        """Byte offset where line_number starts, or None past the end of the file."""
+        block, skip = divmod(line_number, self.stride)
+        while block >= len(self._offsets) and not self._complete:
+            offset = self._offsets[-1]
+            for _ in range(self.stride):
+                offset = self._next_line(offset)
+                if offset >= self._size:
+                    self._complete = True
+                    break
+            else:
+                self._offsets.append(offset)
+        if block >= len(self._offsets):
+            return None
+        offset = self._offsets[block]
+        for _ in range(skip):
+            if offset >= self._size:
+                return None
+            offset = self._next_line(offset)
+        return offset if offset < self._size else None
+
+    def get_line(self, line_number):
+        """Returns line `line_number` (0-based, with its newline); raises IndexError past the end."""
+        offset = self._line_offset(line_number)
+        if offset is None:
+            raise IndexError(f"line {line_number} is past the end of the file")
+        return self._mapped[offset:self._next_line(offset)].decode(self.encoding)
+
+    def iter_lines(self, start=0, stop=None):
+        """Yields lines start..stop-1, seeking straight to `start`."""
+        offset = self._line_offset(start)
+        line_number = start
+        while offset is not None and offset < self._size and (stop is None or line_number < stop):
+            end = self._next_line(offset)
+            yield self._mapped[offset:end].decode(self.encoding)
+            offset, line_number = end, line_number + 1
+
+# 17. Typed, columnar CSV ingestion
+# Rows are read in batches, transposed with zip(*rows) and converted column by
+# column with map(), so the per-value work stays in C. Numeric columns land in
+# array('q') / array('d') buffers (or NumPy arrays) instead of lists of strings.
+CSV_BATCH_SIZE = 100_000
+CSV_TYPE_ORDER = ("int", "float", "str")  # Columns only ever widen left to right
+CSV_TYPECODES = {"int": "q", "float": "d"}
+
+def _parse_float(value):
+    return float(value) if value else math.nan
+
+def _convert_column(values, type_name):
+    """Converts a tuple of strings; returns (column, type), widening if values do not fit."""
+    if type_name == "int":
+        try:
+            return array('q', map(int, values)), "int"
+        except ValueError:
+            type_name = "float"
+        except OverflowError:
+            return list(values), "str"  # Wider than int64: keep the digits exact as text
+    if type_name == "float":
+        try:
+            return array('d', map(float, values)), "float"
+        except ValueError:
+            try:
+                return array('d', map(_parse_float, values)), "float"  # Empty cells -> NaN
+            except ValueError:
+                pass
+    return list(values), "str"
+
+def _widen(column, from_type, to_type):
+    if from_type == to_type:
+        return column
+    if to_type == "float":
+        return array('d', column)
+    raise ValueError(f"cannot widen a {from_type} column to {to_type} without its source text")
+
+def _final_schema(names, schema, parts):
+    """Returns the widest type each column reached in any part."""
+    final = {name: schema.get(name, "int") for name in names}
+    for columns in parts:
+        for name in columns:
+            final[name] = _wider(final[name], _column_type(columns[name]))
+    return final
+
+def _needs_reparse(columns, final):
+    return any(final[name] == "str" and _column_type(column) != "str"
+               for name, column in columns.items())
+
+def _wider(type_a, type_b):
+    return max(type_a, type_b, key=CSV_TYPE_ORDER.index)
+
+def _column_type(column):
+    return CSV_TYPE_ORDER[list(CSV_TYPECODES.values()).index(column.typecode)] \
+        if isinstance(column, array) else "str"
+
+def _rows_to_columns(rows, names, schema):
+    """Converts a batch of rows to {name: column}, updating schema in place when a column widens."""
+    width = len(names)
+    # csv yields [] for blank lines; short rows are padded so zip(*rows) never drops a column
+    rows = [row if len(row) >= width else row + [''] * (width - len(row)) for row in rows if row]
+    columns = {}
+    for name, values in zip(names, zip(*rows)):
+        columns[name], schema[name] = _convert_column(values, schema.get(name, "int"))
+    return columns
+
+def _to_output(columns, as_numpy):
+    if not as_numpy:
+        return columns
+    if np is None:
+        raise ImportError("as_numpy=True requires NumPy")
+    return {name: np.frombuffer(column, dtype=np.int64 if column.typecode == 'q' else np.float64)
+            if isinstance(column, array) else np.array(column, dtype=object)
+            for name, column in columns.items()}
+
+def iter_csv_batches(file_path, batch_size=CSV_BATCH_SIZE, schema=None, as_numpy=False,
+                     delimiter=','):
+    """Yields batches of typed columns ({name: array/list}) from a CSV file with a header row.
+
+    `schema` maps column name to "int", "float" or "str"; columns not listed
+    are inferred from the first batch and widened if a later value does not fit.
+    """
+    schema = dict(schema or {})
+    with open(file_path, newline='', encoding='utf-8', buffering=1024 * 1024) as csvfile:
+        reader = csv.reader(csvfile, delimiter=delimiter)
+        names = next(reader, None)
+        if names is None:
+            return
+        while True:
+            rows = list(itertools.islice(reader, batch_size))
+            if not rows:
+                break
+            yield _to_output(_rows_to_columns(rows, names, schema), as_numpy)
+
+def _parse_csv_range(task):
+    """Worker entry point: parses rows in bytes [start, end) of the file."""
+    file_path, start, end, names, schema, delimiter = task
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode('utf-8')
+    rows = list(csv.reader(io.StringIO(text, newline=''), delimiter=delimiter))
+    return _rows_to_columns(rows, names, dict(schema))
+
+def _split_csv_ranges(file_path, start, parts):
+    size = os.path.getsize(file_path)
+    step = max((size - start) // parts, 1)
+    boundaries = [start]
+    with open(file_path, 'rb') as file:
+        while boundaries[-1] + step < size:
+            file.seek(boundaries[-1] + step)
+            file.readline()  # Cut at the start of the next row
+            if file.tell() >= size:
+                break
+            boundaries.append(file.tell())
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+def read_csv_columns(file_path, schema=None, workers=0, as_numpy=False, delimiter=','):
+    """Reads a whole CSV file into typed columns, optionally parsing ranges in parallel.
+
+    With workers > 0 the file is split into byte ranges at row boundaries and
+    parsed on a process pool; this assumes quoted fields never contain
+    newlines. The schema is inferred from the first rows so that all workers
+    agree, and columns any worker had to widen are widened everywhere.
+    """
+    schema = dict(schema or {})
+    with open(file_path, 'rb') as file:
+        header = file.readline()
+        data_start = file.tell()
+    names = next(csv.reader([header.decode('utf-8')], delimiter=delimiter), [])
+    sample = next(iter_csv_batches(file_path, 10_000, schema, delimiter=delimiter), {})
+    for name in names:
+        if name not in schema and name in sample:
+            schema[name] = _column_type(sample[name])
+
+    # Numbers cannot be turned back into their original text ("02100", "1.50"),
+    # so parts parsed before a column widened to str are re-parsed from the file
+    if workers:
+        ranges = _split_csv_ranges(file_path, data_start, workers * 4)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            tasks = [(file_path, start, end, names, schema, delimiter) for start, end in ranges]
+            parts = list(executor.map(_parse_csv_range, tasks))
+            final = _final_schema(names, schema, parts)
+            stale = [i for i, columns in enumerate(parts) if _needs_reparse(columns, final)]
+            tasks = [(file_path, *ranges[i], names, final, delimiter) for i in stale]
+            for i, columns in zip(stale, executor.map(_parse_csv_range, tasks)):
+                parts[i] = columns
+    else:
+        parts = list(iter_csv_batches(file_path, schema=schema, delimiter=delimiter))
+        final = _final_schema(names, schema, parts)
+        if any(_needs_reparse(columns, final) for columns in parts):
+            parts = list(iter_csv_batches(file_path, schema=final, delimiter=delimiter))
+    parts = [columns for columns in parts if columns]
+
+    result = {}
+    for name in names:
+        typecode = CSV_TYPECODES.get(final[name])
+        merged = array(typecode) if typecode else []
+        for columns in parts:
+            merged.extend(_widen(columns[name], _column_type(columns[name]), final[name]))
+        result[name] = merged
+    return _to_output(result, as_numpy)
+
+class CsvBatchWriter:
+    """Buffers rows and writes them with writerows in batches through a large file buffer."""
+    def __init__(self, file_path, header=None, batch_size=CSV_BATCH_SIZE, delimiter=','):
+        self.file = open(file_path, 'w', newline='', encoding='utf-8', buffering=1024 * 1024)
+        self.writer = csv.writer(self.file, delimiter=delimiter)
+        self.batch_size = batch_size
+        self.rows = []
+        if header:
+            self.writer.writerow(header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write_row(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.write_row(row)
+
+    def write_columns(self, columns):
+        """Writes a {name: sequence} batch (e.g. from iter_csv_batches) as rows."""
+        self.flush()
+        self.writer.writerows(zip(*columns.values()))
+
+    def flush(self):
+        if self.rows:
+            self.writer.writerows(self.rows)
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+def write_csv_columns(file_path, columns, delimiter=','):
+    """Writes columnar data ({name: sequence}) with a header row."""
+    with CsvBatchWriter(file_path, list(columns), delimiter=delimiter) as writer:
+        writer.write_columns(columns)
+    print(f"CSV file written: {file_path}")
+
+def benchmark_csv(rows=2_000_000, workers=4):
+    """Compares plain csv.reader (lists of strings) with the typed columnar reader."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "bench.csv")
+        start = time.perf_counter()
+        with CsvBatchWriter(path, ["id", "price", "qty", "name"]) as writer:
+            writer.write_rows((i, i * 0.5, i % 97, f"item{i % 1000}") for i in range(rows))
+        print(f"write {rows} rows: {time.perf_counter() - start:.2f}s "
+              f"({os.path.getsize(path) / 1e6:.0f} MB)")
+
+        start = time.perf_counter()
+        with open(path, newline='', encoding='utf-8') as csvfile:
+            data = list(csv.reader(csvfile))
+        elapsed = time.perf_counter() - start
+        size = sum(sys.getsizeof(row) + sum(map(sys.getsizeof, row)) for row in data)
+        print(f"csv.reader -> list of rows:   {elapsed:.2f}s, {size / 1e6:.0f} MB held")
+        del data
+
+        start = time.perf_counter()
+        count = sum(len(batch["id"]) for batch in iter_csv_batches(path))
+        print(f"iter_csv_batches (typed):     {time.perf_counter() - start:.2f}s ({count} rows)")
+
+        start = time.perf_counter()
+        columns = read_csv_columns(path)
+        elapsed = time.perf_counter() - start
+        size = sum(sys.getsizeof(column) + (sum(map(sys.getsizeof, column))
+                                            if isinstance(column, list) else 0)
+                   for column in columns.values())
+        print(f"read_csv_columns:             {elapsed:.2f}s, {size / 1e6:.0f} MB held")
+
+        start = time.perf_counter()
+        parallel = read_csv_columns(path, workers=workers)
+        print(f"read_csv_columns(workers={workers}): {time.perf_counter() - start:.2f}s")
+        assert all(columns[name] == parallel[name] for name in columns)
+
 # Example usage (Uncomment to run)
 # create_directory("test_dir")
 # temp_file = create_temp_file()
@@ -116,5 +1014,26 @@ def write_csv_file(file_path, data):
 # extract_zip("example.zip", "extracted")
 # write_text_file("example.txt", "Hello, World!")
 # print(read_text_file("example.txt"))
+# for line in read_text_file("huge.txt", mode="mmap"):
+#     pass
+# with LineIndex("huge.txt") as lines:
+#     print(lines.get_line(10_000_000))
 # write_csv_file("data.csv", [["Name", "Age"], ["Alice", 30], ["Bob", 25]])
 # read_csv_file("data.csv")
+# for batch in iter_csv_batches("big.csv", batch_size=500_000, schema={"zip": "str"}):
+#     print(sum(batch["price"]) / len(batch["price"]))
+# columns = read_csv_columns("big.csv", workers=8)
+# write_csv_columns("copy.csv", columns)
+# benchmark_csv(rows=2_000_000)
+# create_zip_parallel("example.zip", ["file1.txt", "file2.txt", "video.mp4"], level=6, workers=8)
+# extract_zip_parallel("example.zip", "extracted", workers=8)
+# pairs = [(entry.path, entry.path.replace("build/", "deploy/", 1))
+#          for entry in walk_directory("build") if not entry.is_dir]
+# stats = copy_files(pairs, workers=32)  # Re-running skips files that are already up to date
+# for entry in walk_directory("/mnt/share", include="*.log", exclude=[".git", "node_modules"],
+#                             max_depth=3, workers=16):
+#     print(entry.path, entry.size)
+# index = FileIndex("/mnt/share", "share_index.sqlite")
+# index.refresh()  # First run lists everything; later runs only re-list changed directories
+# print(match_pattern("/mnt/share", "**/*.csv", index=index))
+# print(get_file_properties("/mnt/share/data/report.csv", index=index))
@@ -1,5 +1,35 @@
+import asyncio
+import codecs
+import hashlib
 import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import aiohttp  # Optional: only needed for the async helpers
+except ImportError:
+    aiohttp = None
+
+try:
+    import orjson  # Optional: fastest JSON backend
+except ImportError:
+    orjson = None
+
+try:
+    import ujson  # Optional: fallback fast JSON backend
+except ImportError:
+    ujson = None
 
 """
 This script provides common patterns for dealing with JSON data, making HTTP requests, and hitting API endpoints.
@@ -7,51 +37,772 @@ This script provides common patterns for dealing with JSON data, making HTTP req
 Key Topics Covered:
 - Parsing JSON data
 - Writing JSON to files
+- Fast pluggable JSON codecs and streaming reads/writes of large exports
 - Making GET and POST requests with requests
 - Handling API responses and errors
+- Pooled sessions, timeouts, retries with backoff and concurrent batches
+- Async (asyncio/aiohttp) requests with bounded concurrency and pagination
+- Caching GET responses with TTL, ETag revalidation and LRU eviction
 """
 
 # 1. Working with JSON Data
+# Reads and compact writes go through a JsonCodec, which uses orjson or ujson
+# when installed and the standard library otherwise. Large exports can be
+# streamed record by record with iter_json_records / JsonRecordWriter.
+JSON_CHUNK_SIZE = 1024 * 1024
+JSON_BACKENDS = ("orjson", "ujson", "json")  # Preference order for get_json_codec()
+
+class JsonCodec:
+    """Uniform loads(bytes/str) / dumps(obj) -> bytes over one JSON backend."""
+    def __init__(self, name):
+        self.name = name
+        if name == "orjson":
+            if orjson is None:
+                raise ImportError("the orjson codec requires the orjson package")
+            self._loads = orjson.loads
+            self._dumps = orjson.dumps
+        elif name == "ujson":
+            if ujson is None:
+                raise ImportError("the ujson codec requires the ujson package")
+            self._loads = ujson.loads
+            self._dumps = lambda obj: ujson.dumps(obj, ensure_ascii=False).encode('utf-8')
+        elif name == "json":
+            self._loads = json.loads
+            self._dumps = _stdlib_dumps
+        else:
+            raise ValueError(f"unknown JSON backend {name!r}; expected one of {JSON_BACKENDS}")
+
+    def loads(self, data):
+        """Decodes bytes/str; anything the fast backend could get wrong goes to the stdlib.
+
+        Integers of 19+ digits may not fit in 64 bits (orjson would silently
+        turn them into floats), and NaN/Infinity are rejected by the fast
+        backends but accepted (and written) by the json module.
+        """
+        if self._loads is json.loads or _WIDE_NUMBER.search(
+                data if isinstance(data, (bytes, bytearray)) else data.encode('utf-8')):
+            return json.loads(data)
+        try:
+            return self._loads(data)
+        except ValueError:
+            return json.loads(data)
+
+    def dumps(self, obj):
+        """Compact UTF-8 encoding; falls back to the stdlib for values the backend rejects
+        (e.g. orjson with non-string keys or integers wider than 64 bits).
+
+        NaN and +/-Infinity are always written as the json module does
+        (NaN, Infinity, -Infinity), whichever backend is installed: orjson
+        would silently write them as null.
+        """
+        try:
+            data = self._dumps(obj)
+        except (TypeError, OverflowError):
+            return _stdlib_dumps(obj)
+        if self._dumps is not _stdlib_dumps and b"null" in data and _has_non_finite(obj):
+            return _stdlib_dumps(obj)
+        return data
+
+_WIDE_NUMBER = re.compile(rb"\d{19}")
+
+def _has_non_finite(obj):
+    """True if obj contains a NaN or infinite float (only walked when the output has a null)."""
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+_codecs = {}
+
+def get_json_codec(name=None):
+    """Returns the codec for `name`, or the fastest installed backend when name is None."""
+    if name is None:
+        name = next(backend for backend in JSON_BACKENDS
+                    if backend == "json" or globals().get(backend) is not None)
+    if name not in _codecs:
+        _codecs[name] = JsonCodec(name)
+    return _codecs[name]
 
-def load_json_from_file(file_path):
+def load_json_from_file(file_path, codec=None):
     """Loads JSON data from a file."""
-    with open(file_path, 'r', encoding='utf-8') as file:
-        return json.load(file)
+    with open(file_path, 'rb') as file:
+        return get_json_codec(codec).loads(file.read())
 
-def write_json_to_file(file_path, data):
-    """Writes JSON data to a file."""
-    with open(file_path, 'w', encoding='utf-8') as file:
-        json.dump(data, file, indent=4)
+def write_json_to_file(file_path, data, compact=False, codec=None):
+    """Writes JSON data to a file.
+
+    compact=True skips indentation and encodes with the fast codec; the
+    default keeps the human-readable indent=4 output.
+    """
+    if compact:
+        with open(file_path, 'wb') as file:
+            file.write(get_json_codec(codec).dumps(data))
+    else:
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, indent=4)
     print(f"JSON data written to {file_path}")
 
 def parse_json_string(json_string):
     """Parses a JSON string into a Python dictionary."""
     return json.loads(json_string)
 
+def _iter_array_items(file, chunk_size):
+    """Yields the items of a top-level JSON array from a binary file, one at a time.
+
+    Only the current item (plus one read chunk) is held in memory. Items are
+    decoded with JSONDecoder.raw_decode; an item that runs past the end of the
+    buffer is retried after reading more.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = file.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + text_decoder.decode(chunk, final=eof)
+        pos = 0
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill()
+
+    skip_whitespace()
+    if buffer[pos:pos + 1] != "[":
+        raise ValueError("expected a top-level JSON array")
+    pos += 1
+    skip_whitespace()
+    if buffer[pos:pos + 1] == "]":
+        return
+    while True:
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+            # A number cut at the buffer edge (e.g. "-1." of "-1.5") is not finished
+            complete = eof or buffer[end:end + 1] in (",", "]", " ", "\t", "\r", "\n")
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if not complete:
+            fill()
+            continue
+        yield item
+        pos = end
+        skip_whitespace()
+        separator = buffer[pos:pos + 1]
+        pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"expected ',' or ']' in JSON array, found {separator!r}")
+        skip_whitespace()
+
+def iter_json_records(file_path, chunk_size=JSON_CHUNK_SIZE, codec=None):
+    """Streams records from a large JSON export without loading the whole file.
+
+    A file whose first non-blank character is '[' yields the array's items;
+    anything else is read as JSON lines (one document per line, blank lines
+    skipped). Peak memory is about one record plus one chunk.
+    """
+    with open(file_path, 'rb', buffering=chunk_size) as file:
+        head = file.read(64).lstrip(b"\xef\xbb\xbf \t\r\n")[:1]
+        file.seek(0)
+        if head == b"[":
+            yield from _iter_array_items(file, chunk_size)
+            return
+        loads = get_json_codec(codec).loads
+        for line in file:
+            if line.strip():
+                yield loads(line)
+
+class JsonRecordWriter:
+    """Writes records compactly through a large buffer, as JSON lines or as one JSON array."""
+    def __init__(self, file_path, fmt="lines", codec=None, buffer_size=JSON_CHUNK_SIZE):
+        if fmt not in ("lines", "array"):
+            raise ValueError("fmt must be 'lines' or 'array'")
+        self.fmt = fmt
+        self.dumps = get_json_codec(codec).dumps
+        self.file = open(file_path, 'wb', buffering=buffer_size)
+        self.count = 0
+        if fmt == "array":
+            self.file.write(b"[")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, record):
+        if self.fmt == "lines":
+            self.file.write(self.dumps(record) + b"\n")
+        else:
+            self.file.write((b",\n" if self.count else b"\n") + self.dumps(record))
+        self.count += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        if self.file.closed:
+            return
+        if self.fmt == "array":
+            self.file.write(b"\n]\n" if self.count else b"]\n")
+        self.file.close()
+
+def write_json_records(file_path, records, fmt="lines", codec=None):
+    """Writes an iterable of records without materializing it; returns the record count."""
+    with JsonRecordWriter(file_path, fmt, codec) as writer:
+        writer.write_many(records)
+    print(f"JSON data written to {file_path}")
+    return writer.count
+
 # 2. Making HTTP Requests
+# All helpers go through one shared ApiClient (see 3), so calls reuse pooled
+# keep-alive connections and get a timeout and retries by default.
+
+def make_get_request(url, params=None, client=None, cache=None):
+    """Makes a GET request to the given URL with optional query parameters.
 
-def make_get_request(url, params=None):
-    """Makes a GET request to the given URL with optional query parameters."""
+    Pass a ResponseCache (see 5) to serve repeated calls from the cache.
+    """
     try:
-        response = requests.get(url, params=params)
+        if cache is not None:
+            return cache.get_json(client or get_default_client(), url, params)
+        response = (client or get_default_client()).request("GET", url, params=params)
         response.raise_for_status()  # Raise an error for bad responses
         return response.json()
     except requests.RequestException as e:
         print(f"Error making GET request: {e}")
         return None
 
-def make_post_request(url, data, headers=None):
+def make_post_request(url, data, headers=None, client=None):
     """Makes a POST request to the given URL with JSON data."""
     try:
         headers = headers or {'Content-Type': 'application/json'}
-        response = requests.post(url, json=data, headers=headers)
+        response = (client or get_default_client()).request("POST", url, json=data, headers=headers)
         response.raise_for_status()
         return response.json()
     except requests.RequestException as e:
         print(f"Error making POST request: {e}")
         return None
 
-# 3. Example Usage (Uncomment to run)
+# 3. Pooled HTTP Client with Retries and Concurrent Batches
+DEFAULT_TIMEOUT = (3.05, 30)  # (connect, read) seconds
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+class ApiClient:
+    """A shared requests.Session with a sized connection pool, timeouts and retries.
+
+    Failed idempotent requests (connection errors, timeouts, RETRY_STATUSES)
+    are retried up to max_retries times with full-jitter exponential backoff,
+    honouring Retry-After when the server sends it. POST is only retried when
+    retry_non_idempotent=True.
+    """
+    def __init__(self, pool_size=32, timeout=DEFAULT_TIMEOUT, max_retries=3, backoff=0.5,
+                 max_backoff=30.0, retry_non_idempotent=False, headers=None):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_non_idempotent = retry_non_idempotent
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def _delay(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def request(self, method, url, **kwargs):
+        """Sends a request and returns the final requests.Response (after any retries)."""
+        kwargs.setdefault("timeout", self.timeout)
+        retries = self.max_retries if (method.upper() in IDEMPOTENT_METHODS
+                                       or self.retry_non_idempotent) else 0
+        for attempt in range(retries + 1):
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == retries:
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+            delay = self._delay(attempt, response)
+            response.close()  # Return the connection to the pool before sleeping
+            time.sleep(delay)
+
+    def get_json(self, url, params=None, **kwargs):
+        response = self.request("GET", url, params=params, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def batch(self, calls, workers=None):
+        """Runs many requests concurrently and returns their JSON results in input order.
+
+        Each call is a dict of request() arguments, e.g. {"url": ..., "params": ...}
+        ("method" defaults to GET). A call that fails yields None in its slot.
+        """
+        def run(call):
+            call = dict(call)
+            method = call.pop("method", "GET")
+            try:
+                response = self.request(method, call.pop("url"), **call)
+                response.raise_for_status()
+                return response.json()
+            except (requests.RequestException, ValueError) as e:
+                print(f"Error making {method} request: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=workers or self.pool_size) as executor:
+            return list(executor.map(run, calls))
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+def get_default_client():
+    """Returns the process-wide ApiClient, creating it on first use."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = ApiClient()
+        return _default_client
+
+def make_batch_requests(calls, workers=16, client=None):
+    """Fans out many API calls concurrently; results come back in input order."""
+    return (client or get_default_client()).batch(calls, workers)
+
+# 4. Async (asyncio) API Helpers
+# Native coroutines on aiohttp so an asyncio service never blocks its event
+# loop. A semaphore caps requests in flight and the connector caps connections
+# per host; retries use the same backoff policy as ApiClient.
+
+def _require_aiohttp(feature):
+    # Checked up front: with aiohttp missing, `except aiohttp.ClientError`
+    # would raise AttributeError and hide the real error
+    if aiohttp is None:
+        raise ImportError(f"{feature} requires the aiohttp package")
+
+class AsyncApiClient:
+    """aiohttp-based counterpart of ApiClient with bounded concurrency."""
+    def __init__(self, concurrency=64, limit_per_host=16, timeout=DEFAULT_TIMEOUT, max_retries=3,
+                 backoff=0.5, max_backoff=30.0, headers=None):
+        _require_aiohttp("AsyncApiClient")
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.headers = headers
+        self.concurrency = concurrency
+        self.limit_per_host = limit_per_host
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.session = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.limit_per_host)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                                 headers=self.headers)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    async def request_json(self, method, url, **kwargs):
+        """Sends a request (with retries) and returns the decoded JSON body."""
+        await self.start()
+        retries = self.max_retries if method.upper() in IDEMPOTENT_METHODS else 0
+        async with self.semaphore:
+            for attempt in range(retries + 1):
+                try:
+                    async with self.session.request(method, url, **kwargs) as response:
+                        if response.status in RETRY_STATUSES and attempt < retries:
+                            delay = self._delay(attempt, response.headers.get("Retry-After"))
+                        else:
+                            response.raise_for_status()
+                            return await response.json(content_type=None)
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    if attempt == retries:
+                        raise
+                    delay = self._delay(attempt)
+                await asyncio.sleep(delay)
+
+    async def get_json(self, url, params=None, **kwargs):
+        return await self.request_json("GET", url, params=params, **kwargs)
+
+    async def stream_json_lines(self, url, params=None, **kwargs):
+        """Yields records from a JSON-lines (NDJSON) response as they arrive, one at a time."""
+        await self.start()
+        async with self.semaphore:
+            async with self.session.get(url, params=params, **kwargs) as response:
+                response.raise_for_status()
+                async for line in response.content:  # Reads line by line, never the whole body
+                    if line.strip():
+                        yield json.loads(line)
+
+    async def batch(self, calls):
+        """Runs many calls concurrently (bounded by the semaphore); results keep input order."""
+        async def run(call):
+            call = dict(call)
+            method = call.pop("method", "GET")
+            try:
+                return await self.request_json(method, call.pop("url"), **call)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                print(f"Error making {method} request: {e}")
+                return None
+
+        return await asyncio.gather(*(run(call) for call in calls))
+
+    async def paginate(self, url, params=None, items_key="items", cursor_key=None,
+                       cursor_param="cursor", page_param="page", first_page=1):
+        """Async-iterates the items of a paginated API, prefetching the next page.
+
+        Cursor-based: pass cursor_key, the response field holding the next
+        cursor (sent back as `cursor_param`); iteration ends when it is empty.
+        Page-based (default): `page_param` counts up from first_page until a
+        page comes back empty. The next page is requested before the current
+        page's items are handed to the caller. To stop early, wrap the iterator
+        in contextlib.aclosing so the prefetch is cancelled right away.
+        """
+        def prefetch():
+            task = asyncio.ensure_future(self.get_json(url, params=dict(params)))
+            # An abandoned prefetch must not log "exception was never retrieved"
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            return task
+
+        params = dict(params or {})
+        if cursor_key is None:
+            params[page_param] = first_page
+        task = prefetch()
+        try:
+            while task is not None:
+                page = await task
+                items = (page.get(items_key) or []) if isinstance(page, dict) else (page or [])
+                task = None
+                if cursor_key is not None:
+                    cursor = page.get(cursor_key) if isinstance(page, dict) else None
+                    if cursor:
+                        params[cursor_param] = cursor
+                        task = prefetch()
+                elif items:
+                    params[page_param] += 1
+                    task = prefetch()
+                for item in items:
+                    yield item
+        finally:
+            if task is not None and not task.done():
+                task.cancel()
+
+async def async_get_request(url, params=None, client=None):
+    """Async counterpart of make_get_request."""
+    _require_aiohttp("async_get_request")
+    try:
+        if client is not None:
+            return await client.get_json(url, params=params)
+        async with AsyncApiClient() as temp_client:
+            return await temp_client.get_json(url, params=params)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Error making GET request: {e}")
+        return None
+
+async def async_post_request(url, data, headers=None, client=None):
+    """Async counterpart of make_post_request."""
+    _require_aiohttp("async_post_request")
+    headers = headers or {'Content-Type': 'application/json'}
+    try:
+        if client is not None:
+            return await client.request_json("POST", url, json=data, headers=headers)
+        async with AsyncApiClient() as temp_client:
+            return await temp_client.request_json("POST", url, json=data, headers=headers)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Error making POST request: {e}")
+        return None
+
+# Local stand-in API server and async vs threaded benchmark
+class _MockApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so connection pooling is visible
+    delay = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.delay)  # Simulated server latency
+        query = dict(parse_qsl(urlsplit(self.path).query))
+        page = int(query.get("page", 1))
+        body = json.dumps({"path": self.path, "items": [page] if page <= 10 else []}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def start_mock_api_server(delay=0.01):
+    """Starts a local JSON API on a background thread; returns (server, base_url)."""
+    handler = type("MockApiHandler", (_MockApiHandler,), {"delay": delay})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def benchmark_async_vs_threaded(n_requests=2000, concurrency=64, delay=0.01):
+    """Compares request throughput of ApiClient.batch (threads) and AsyncApiClient.batch."""
+    server, base_url = start_mock_api_server(delay)
+    calls = [{"url": f"{base_url}/items/{i}"} for i in range(n_requests)]
+    try:
+        with ApiClient(pool_size=concurrency) as client:
+            start = time.perf_counter()
+            client.batch(calls, workers=concurrency)
+            threaded = time.perf_counter() - start
+
+        async def run_async():
+            async with AsyncApiClient(concurrency=concurrency, limit_per_host=concurrency) as client:
+                start = time.perf_counter()
+                await client.batch(calls)
+                return time.perf_counter() - start
+
+        asynchronous = asyncio.run(run_async())
+    finally:
+        server.shutdown()
+    print(f"threaded: {n_requests / threaded:8.0f} req/s   asyncio: {n_requests / asynchronous:8.0f} req/s")
+
+# 5. HTTP Response Cache
+# Opt-in cache for make_get_request: an in-memory LRU bounded by body bytes,
+# an optional on-disk tier, per-entry TTL, and ETag / Last-Modified
+# revalidation so an unchanged resource costs a 304 instead of a full body.
+# Concurrent identical requests share one in-flight fetch. Disk entries are
+# a JSON metadata line followed by the raw body (never pickle, so a writable
+# cache directory cannot be used to run code).
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_TTL = 60.0  # Seconds, used when the response has no Cache-Control max-age
+
+class _CacheEntry:
+    __slots__ = ("body", "etag", "last_modified", "expires")  # expires: wall-clock, valid across processes
+
+    def __init__(self, body, etag, last_modified, expires):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+
+def cache_key(url, params=None):
+    """Normalizes URL + params (query-string and params merged, sorted) into a cache key."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        items = params.items() if isinstance(params, dict) else params
+        for name, value in items:
+            values = value if isinstance(value, (list, tuple)) else [value]
+            query.extend((str(name), str(v)) for v in values if v is not None)
+    base = parts._replace(scheme=parts.scheme.lower(), netloc=parts.netloc.lower(),
+                          query="", fragment="").geturl()
+    return f"{base}?{urlencode(sorted(query))}" if query else base
+
+def _max_age(response):
+    for directive in response.headers.get("Cache-Control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if name.lower() in ("no-store", "no-cache"):
+            return 0.0
+        if name.lower() == "max-age" and value.isdigit():
+            return float(value)
+    return None
+
+def _decode_body(body):
+    """json.loads, raising requests' JSONDecodeError like Response.json() does."""
+    try:
+        return json.loads(body)
+    except json.JSONDecodeError as e:
+        raise requests.JSONDecodeError(e.msg, e.doc, e.pos) from e
+
+class ResponseCache:
+    """Caches GET response bodies; see get_json.
+
+    `stats` counts hits (served without a request), revalidated (served after
+    a 304), misses (full fetches), evictions (entries dropped from memory to
+    stay under max_bytes) and collapsed (callers that waited on another
+    caller's identical in-flight request).
+    """
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._entries = OrderedDict()  # key -> _CacheEntry, least recently used first
+        self._size = 0
+        self._inflight = {}  # key -> Future shared by concurrent identical requests
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "evictions": 0, "collapsed": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode()).hexdigest() + ".cache")
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'rb') as file:
+                meta = json.loads(file.readline())
+                entry = _CacheEntry(file.read(), meta["etag"], meta["last_modified"],
+                                    float(meta["expires"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None  # Missing or unreadable entries are refetched
+        self._store_memory(key, entry)  # Promote to the memory tier
+        return entry
+
+    def _store_memory(self, key, entry):
+        size = len(entry.body)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old.body)
+            if size > self.max_bytes:
+                return  # Too large for memory; the disk tier may still hold it
+            self._entries[key] = entry
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+                self.stats["evictions"] += 1
+
+    def _store(self, key, entry):
+        self._store_memory(key, entry)
+        if self.cache_dir:
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            meta = {"etag": entry.etag, "last_modified": entry.last_modified,
+                    "expires": entry.expires}
+            with open(tmp_path, 'wb') as file:
+                file.write(json.dumps(meta).encode('utf-8') + b"\n")  # Escapes any newlines
+                file.write(entry.body)
+            os.replace(tmp_path, path)  # Readers never see a half-written entry
+
+    def _fetch(self, client, url, params, key, entry):
+        """Fetches (or revalidates) one entry; returns the body bytes."""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        response = client.request("GET", url, params=params, headers=headers)
+        max_age = _max_age(response)
+        expires = time.time() + (self.ttl if max_age is None else max_age)
+        if response.status_code == 304 and entry is not None:
+            self._count("revalidated")
+            self._store(key, _CacheEntry(entry.body, response.headers.get("ETag", entry.etag),
+                                         response.headers.get("Last-Modified", entry.last_modified),
+                                         expires))
+            return entry.body
+        response.raise_for_status()
+        self._count("misses")
+        body = response.content
+        if "no-store" not in response.headers.get("Cache-Control", ""):
+            self._store(key, _CacheEntry(body, response.headers.get("ETag"),
+                                         response.headers.get("Last-Modified"), expires))
+        return body
+
+    def get_json(self, client, url, params=None):
+        """Returns the decoded JSON for GET url?params, from the cache when it is fresh.
+
+        A stale entry with an ETag or Last-Modified is revalidated with a
+        conditional request. Errors propagate to every collapsed caller.
+        """
+        key = cache_key(url, params)
+        entry = self._lookup(key)
+        if entry is not None and entry.expires > time.time():
+            self._count("hits")
+            return _decode_body(entry.body)
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.stats["collapsed"] += 1
+        if not owner:
+            return _decode_body(future.result())
+
+        try:
+            body = self._fetch(client, url, params, key, entry)
+            future.set_result(body)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return _decode_body(body)
+
+    def clear(self):
+        """Drops every cached entry from memory and disk (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        if self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".cache"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+# 6. Example Usage (Uncomment to run)
 # sample_json = '{"name": "Alice", "age": 30}'
 # parsed_data = parse_json_string(sample_json)
 # print(parsed_data)
@@ -60,9 +811,33 @@ def make_post_request(url, data, headers=None):
 # loaded_data = load_json_from_file("data.json")
 # print(loaded_data)
 
+# write_json_records("export.jsonl", ({"id": i, "value": i * 2} for i in range(1_000_000)))
+# total = sum(record["value"] for record in iter_json_records("export.jsonl"))
+# print(get_json_codec().name, total)
+
 # api_response = make_get_request("https://jsonplaceholder.typicode.com/posts/1")
 # print(api_response)
 
+# cache = ResponseCache(max_bytes=16 * 1024 * 1024, ttl=300, cache_dir=".http_cache")
+# for _ in range(3):
+#     make_get_request("https://jsonplaceholder.typicode.com/posts", {"userId": 1}, cache=cache)
+# print(cache.stats)  # {'hits': 2, 'misses': 1, ...}
+
+# posts = make_batch_requests([{"url": f"https://jsonplaceholder.typicode.com/posts/{i}"} for i in range(1, 101)])
+# print(len(posts))
+
 # post_response = make_post_request("https://jsonplaceholder.typicode.com/posts", {"title": "Test", "body": "Content", "userId": 1})
 # print(post_response)
 
+# import contextlib
+# async def main():
+#     async with AsyncApiClient(concurrency=100, limit_per_host=20) as client:
+#         post = await client.get_json("https://jsonplaceholder.typicode.com/posts/1")
+#         async with contextlib.aclosing(client.paginate("https://api.example.com/items",
+#                                                        cursor_key="next_cursor")) as items:
+#             async for item in items:
+#                 print(item)
+# asyncio.run(main())
+
+# benchmark_async_vs_threaded(n_requests=2000, concurrency=64)
+
@@ -1,5 +1,20 @@
+import os
+import pickle
+import shutil
+import tempfile
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import reduce
+
 import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
+
+try:
+    import pyarrow as pa  # Optional: Parquet inputs and Arrow-backed string columns
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
 
 """
 This script provides common Data Science operations using NumPy and Pandas.
@@ -8,6 +23,7 @@ NumPy Operations:
 - Creating and manipulating arrays
 - Basic mathematical operations
 - Aggregation functions
+- Single-pass, blocked and threaded statistics (also for np.memmap arrays)
 - Reshaping and filtering data
 
 Pandas Operations:
@@ -15,6 +31,11 @@ Pandas Operations:
 - Handling missing data
 - Grouping and aggregations
 - Merging and joining datasets
+
+Out-of-Core Operations:
+- Chunked fillna and groupby aggregations from mergeable partials
+- Hash-partitioned left joins that spill to disk, run on a process pool
+- Downcasting numeric dtypes and categorical/Arrow strings to save memory
 """
 
 # 1. NumPy Operations
@@ -29,6 +50,11 @@ def numpy_operations():
     print("Mean:", np.mean(arr))
     print("Standard Deviation:", np.std(arr))
     
+    # The same aggregates in a single pass over the data (see 5)
+    stats = array_stats(arr)
+    print("Single pass - sum, mean, std:", stats.sum, stats.mean, stats.std())
+    print("Column means:", array_stats(arr, axis=0).mean)
+    
     # Reshaping
     reshaped = arr.reshape(3, 2)
     print("Reshaped Array:\n", reshaped)
@@ -58,8 +84,393 @@ def pandas_operations():
     extra_data = pd.DataFrame({'Name': ['Alice', 'Charlie'], 'City': ['NY', 'LA']})
     merged_df = df.merge(extra_data, on='Name', how='left')
     print("\nMerged DataFrame:\n", merged_df)
+    
+    # Shrinking dtypes (see 4)
+    optimized_df, report = optimize_dtypes(merged_df)
+    print("\nOptimized dtypes:\n", report)
+
+# 3. Out-of-Core Groupby, Fillna and Merge
+# For tables that do not fit in memory. Inputs (CSV or Parquet) are read in
+# chunks; each chunk is reduced to small mergeable partials (count, sum, mean
+# and M2, the sum of squared deviations) that are combined at the end with
+# Chan's parallel update, and left joins hash-partition
+# both tables into spill files so each partition can be joined on its own,
+# in parallel on a process pool.
+OOC_CHUNK_SIZE = 1_000_000
+OOC_AGGREGATES = ("count", "sum", "mean", "var", "std")
+_ROW_NUMBER = "__ooc_row__"  # Carries left-table order through a partitioned join
+
+def iter_table_chunks(path, chunksize=OOC_CHUNK_SIZE, columns=None, **read_kwargs):
+    """Yields DataFrame chunks of a CSV or Parquet (.parquet/.pq) file."""
+    if path.lower().endswith((".parquet", ".pq")):
+        if pq is None:
+            raise ImportError("reading Parquet requires pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=columns, **read_kwargs)
+
+def _bounded_map(function, items, workers, executor_class=ProcessPoolExecutor):
+    """map() over a pool (processes by default) with at most 2 * workers tasks in flight; keeps input order."""
+    if not workers:
+        yield from map(function, items)
+        return
+    with executor_class(max_workers=workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _column_sums(chunk):
+    numeric = chunk.select_dtypes("number")
+    return numeric.sum(), numeric.count()
+
+def column_means(path, chunksize=OOC_CHUNK_SIZE, workers=0, **read_kwargs):
+    """Means of every numeric column, from per-chunk sums and counts (one pass)."""
+    sums = counts = None
+    for chunk_sums, chunk_counts in _bounded_map(
+            _column_sums, iter_table_chunks(path, chunksize, **read_kwargs), workers):
+        sums = chunk_sums if sums is None else sums.add(chunk_sums, fill_value=0)
+        counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+    if sums is None:
+        return pd.Series(dtype="float64")
+    return sums / counts
+
+def fillna_means(path, out_path=None, chunksize=OOC_CHUNK_SIZE, **read_kwargs):
+    """Out-of-core df.fillna(df.mean(numeric_only=True)): two passes, one chunk in memory.
+
+    Writes CSV to out_path, or returns the filled DataFrame when out_path is None.
+    """
+    means = column_means(path, chunksize, **read_kwargs)
+    chunks = (chunk.fillna(means) for chunk in iter_table_chunks(path, chunksize, **read_kwargs))
+    if out_path is None:
+        return pd.concat(chunks, ignore_index=True)
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(out_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    return out_path
+
+def _partial_aggregate(task):
+    """Worker entry point: (chunk, by, columns) -> count/sum/mean/M2 per group."""
+    chunk, by, columns = task
+    grouped = chunk[columns].groupby([chunk[key] for key in by])
+    count = grouped.count()
+    # pandas' grouped var is computed with Welford's method, so M2 stays accurate
+    return pd.concat({"count": count, "sum": grouped.sum(), "mean": grouped.mean(),
+                      "m2": (grouped.var(ddof=0) * count).fillna(0)}, axis=1)
+
+def groupby_aggregate(path, by, aggs=("mean",), columns=None, chunksize=OOC_CHUNK_SIZE,
+                      workers=0, **read_kwargs):
+    """Out-of-core df.groupby(by)[columns].agg(aggs) for count/sum/mean/var/std.
+
+    One pass over the file; memory is bounded by the number of groups, not
+    rows. A single aggregate returns one column per input column, like
+    .agg("mean"); several return (column, aggregate) MultiIndex columns, like
+    .agg(["mean", "std"]). columns defaults to the numeric non-key columns.
+    var/std use ddof=1; per-chunk M2 partials are merged with Chan's update
+    (no sum-of-squares cancellation, so large offsets such as timestamps
+    keep their precision). Results equal the in-memory groupby within
+    floating-point tolerance, not bit for bit (the M2 route can differ in
+    the last ulp even for a single chunk): compare them with
+    np.testing.assert_allclose.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    aggs = [aggs] if isinstance(aggs, str) else list(aggs)
+    unknown = set(aggs) - set(OOC_AGGREGATES)
+    if unknown:
+        raise ValueError(f"unsupported aggregates {sorted(unknown)}; expected {OOC_AGGREGATES}")
+
+    def tasks():
+        nonlocal columns
+        for chunk in iter_table_chunks(path, chunksize, **read_kwargs):
+            if columns is None:
+                columns = [name for name in chunk.select_dtypes("number").columns if name not in by]
+            yield chunk, by, columns
+
+    partials = list(_bounded_map(_partial_aggregate, tasks(), workers))
+    levels = list(range(len(by)))
+    chunks = pd.concat(partials)
+    count = chunks["count"].groupby(level=levels).sum()
+    sums = chunks["sum"].groupby(level=levels).sum()
+    results = {"count": count, "sum": sums, "mean": sums / count}
+    if "var" in aggs or "std" in aggs:
+        # Chan: M2 = sum(M2_i) + sum(n_i * (mean_i - mean)^2) over the chunks of each group
+        deviation = chunks["mean"] - results["mean"].reindex(chunks.index).to_numpy()
+        spread = (chunks["count"] * deviation * deviation).fillna(0)
+        m2 = (chunks["m2"] + spread).groupby(level=levels).sum()
+        results["var"] = (m2 / (count - 1)).where(count > 1)
+        results["std"] = np.sqrt(results["var"])
+    if len(aggs) == 1:
+        return results[aggs[0]]
+    return pd.concat({(name, agg): results[agg][name] for name in columns for agg in aggs}, axis=1)
+
+def _partition_ids(chunk, on, partitions):
+    keys = chunk[on].copy()
+    for name in on:  # Hash 1 and 1.0 alike so int and float keys land in the same partition
+        if pd.api.types.is_numeric_dtype(keys[name]) and not pd.api.types.is_bool_dtype(keys[name]):
+            keys[name] = keys[name].astype("float64")
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy() % partitions
+
+def _spill_partitions(path, on, partitions, spill_dir, prefix, chunksize, number_rows, read_kwargs):
+    """Splits a table into `partitions` pickle-stream files by key hash; returns an empty template."""
+    files = [open(os.path.join(spill_dir, f"{prefix}-{i}.pkl"), 'wb') for i in range(partitions)]
+    template, offset = None, 0
+    try:
+        for chunk in iter_table_chunks(path, chunksize, **read_kwargs):
+            if template is None:
+                template = chunk.iloc[:0]
+            if number_rows:
+                chunk[_ROW_NUMBER] = np.arange(offset, offset + len(chunk))
+                offset += len(chunk)
+            for partition, part in chunk.groupby(_partition_ids(chunk, on, partitions), sort=False):
+                pickle.dump(part, files[partition], protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        for file in files:
+            file.close()
+    return template
+
+def _load_partition(file_path):
+    parts = []
+    with open(file_path, 'rb') as file:
+        while True:
+            try:
+                parts.append(pickle.load(file))
+            except EOFError:
+                break
+    return pd.concat(parts) if parts else None
+
+def _join_partition(task):
+    """Worker entry point: left-joins one partition; writes it to out_file or returns it."""
+    left_file, right_file, on, right_template, suffixes, out_file = task
+    left = _load_partition(left_file)
+    if left is None:
+        return None
+    right = _load_partition(right_file)
+    merged = left.merge(right if right is not None else right_template, on=on, how="left",
+                        suffixes=suffixes)
+    if out_file is None:
+        return merged
+    merged.drop(columns=_ROW_NUMBER).to_csv(out_file, index=False)
+    return out_file
+
+def merge_left(left_path, right_path, on, out_path=None, partitions=16, workers=0,
+               chunksize=OOC_CHUNK_SIZE, suffixes=("_x", "_y"), spill_dir=None, **read_kwargs):
+    """Out-of-core left.merge(right, on=on, how="left") via hash partitioning.
+
+    Both tables are split by key hash into spill files in a temporary
+    directory; every partition then only needs its own rows of each table in
+    memory, and partitions are joined on a process pool when workers > 0.
+    With out_path=None the joined DataFrame is returned in the same row order
+    as the in-memory merge. With out_path the result is written as CSV one
+    partition at a time, so rows come out grouped by partition.
+    """
+    on = [on] if isinstance(on, str) else list(on)
+    with tempfile.TemporaryDirectory(dir=spill_dir) as tmp_dir:
+        _spill_partitions(left_path, on, partitions, tmp_dir, "left", chunksize, True, read_kwargs)
+        right_template = _spill_partitions(right_path, on, partitions, tmp_dir, "right", chunksize,
+                                           False, read_kwargs)
+        tasks = [(os.path.join(tmp_dir, f"left-{i}.pkl"), os.path.join(tmp_dir, f"right-{i}.pkl"),
+                  on, right_template, suffixes,
+                  os.path.join(tmp_dir, f"out-{i}.csv") if out_path else None)
+                 for i in range(partitions)]
+        results = [result for result in _bounded_map(_join_partition, tasks, workers)
+                   if result is not None]
+        if out_path is None:
+            if not results:
+                return None
+            merged = pd.concat(results).sort_values(_ROW_NUMBER, kind="stable")
+            return merged.drop(columns=_ROW_NUMBER).reset_index(drop=True)
+        with open(out_path, 'wb') as out:
+            for i, part_path in enumerate(results):
+                with open(part_path, 'rb') as part:
+                    if i:
+                        part.readline()  # Keep only the first partition's header row
+                    shutil.copyfileobj(part, out, 1024 * 1024)
+        return out_path
+
+# 4. Memory-Optimized DataFrames
+# pandas defaults to int64/float64 and Python-object strings. Most columns fit
+# in far less: integers in the smallest signed type that holds their range
+# (unsigned only on request, since uint arithmetic wraps below zero), floats
+# in float32 when that loses nothing, repetitive strings as category codes,
+# and other strings optionally in Arrow-backed storage.
+CATEGORY_THRESHOLD = 0.5  # Use category when unique values / rows is at most this
+
+def _optimized_dtype(series, category_threshold=CATEGORY_THRESHOLD, arrow_strings=False,
+                     lossy_floats=False, unsigned=False):
+    """Returns the smallest safe dtype for one column (or its current dtype)."""
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+        return dtype
+    if pd.api.types.is_integer_dtype(dtype):
+        if series.empty or series.isna().any():
+            return dtype
+        low, high = series.min(), series.max()
+        unsigned = (unsigned or pd.api.types.is_unsigned_integer_dtype(dtype)) and low >= 0
+        for candidate in ((np.uint8, np.uint16, np.uint32) if unsigned
+                          else (np.int8, np.int16, np.int32)):
+            info = np.iinfo(candidate)
+            if info.min <= low and high <= info.max and np.dtype(candidate).itemsize < dtype.itemsize:
+                return np.dtype(candidate)
+        return dtype
+    if pd.api.types.is_float_dtype(dtype):
+        if dtype == np.float64:
+            values = series.to_numpy()
+            as_float32 = values.astype(np.float32)
+            if lossy_floats or np.array_equal(as_float32.astype(np.float64), values, equal_nan=True):
+                return np.dtype(np.float32)
+        return dtype
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        if arrow_strings and isinstance(dtype, pd.StringDtype) and dtype.storage == "pyarrow":
+            arrow_strings = False  # Already Arrow-backed; only category could still help
+        non_null = series.dropna()
+        if non_null.empty or pd.api.types.infer_dtype(non_null, skipna=True) != "string":
+            return dtype
+        if non_null.nunique() <= category_threshold * len(series):
+            return pd.CategoricalDtype()
+        if arrow_strings and pa is not None:
+            return pd.StringDtype("pyarrow")
+    return dtype
+
+def optimize_dtypes(df, category_threshold=CATEGORY_THRESHOLD, arrow_strings=False,
+                    lossy_floats=False, unsigned=False):
+    """Shrinks each column to its smallest safe dtype; returns (optimized_df, report).
+
+    Integers are downcast to the narrowest signed type that holds their
+    range; unsigned=True lets non-negative columns use uint8/16/32 instead,
+    where e.g. `df.Age - 30` wraps around rather than going negative.
+    float64 becomes float32 only if every value round-trips exactly (or
+    lossy_floats=True); string columns with few distinct values become
+    category, and with arrow_strings=True the rest become Arrow-backed
+    strings. `report` has one row per column with its
+    dtype and deep memory usage before and after, and the bytes saved.
+    """
+    before = df.memory_usage(deep=True, index=False)
+    dtypes = {name: _optimized_dtype(df[name], category_threshold, arrow_strings, lossy_floats, unsigned)
+              for name in df.columns}
+    optimized = df.astype({name: dtype for name, dtype in dtypes.items() if dtype != df[name].dtype})
+    after = optimized.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({"dtype_before": df.dtypes.astype(str), "dtype_after": optimized.dtypes.astype(str),
+                           "bytes_before": before, "bytes_after": after, "bytes_saved": before - after})
+    return optimized, report
+
+def read_csv_optimized(path, chunksize=OOC_CHUNK_SIZE, sample_rows=100_000,
+                       category_threshold=CATEGORY_THRESHOLD, arrow_strings=False,
+                       lossy_floats=False, unsigned=False, **read_kwargs):
+    """pd.read_csv that returns optimize_dtypes()'s result without building the full default frame.
+
+    String columns are planned from the first sample_rows rows and read
+    straight into category (or Arrow string) dtype; the file is then read
+    in chunks, each chunk downcast before the next is parsed, so peak memory
+    is the optimized frame plus one raw chunk. Chunks whose categories or
+    integer ranges differ are combined into a common dtype.
+    """
+    sample = pd.read_csv(path, nrows=sample_rows, **read_kwargs)
+    plan = {}
+    for name in sample.columns:
+        dtype = _optimized_dtype(sample[name], category_threshold, arrow_strings)
+        if isinstance(dtype, (pd.CategoricalDtype, pd.StringDtype)):
+            plan[name] = dtype
+    del sample
+    read_kwargs["dtype"] = {**plan, **read_kwargs.get("dtype", {})}
+
+    chunks = []
+    for chunk in pd.read_csv(path, chunksize=chunksize, **read_kwargs):
+        chunk, _ = optimize_dtypes(chunk, category_threshold=0, lossy_floats=lossy_floats,
+                                   unsigned=unsigned)
+        chunks.append(chunk)
+    if not chunks:
+        return pd.read_csv(path, **read_kwargs)
+    categorical = [name for name in chunks[0].columns
+                   if isinstance(chunks[0][name].dtype, pd.CategoricalDtype)]
+    for name in categorical:  # Give every chunk the same categories so concat keeps category
+        categories = union_categoricals([chunk[name] for chunk in chunks]).categories
+        for chunk in chunks:
+            chunk[name] = chunk[name].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+# 5. Single-Pass Blocked NumPy Statistics
+# np.sum, np.mean and np.std each scan the whole array, and np.std builds
+# array-sized temporaries. array_stats reads the array once, in blocks of
+# rows that fit in cache-friendly memory (so np.memmap files larger than RAM
+# work), reduces each block to (count, sum, mean, M2, min, max) and merges
+# the partials with Chan's parallel update of Welford's algorithm. NumPy
+# releases the GIL inside its loops, so blocks can be reduced on threads.
+STATS_BLOCK_BYTES = 256 * 1024  # Small enough that each block's several sweeps hit the CPU cache
+
+class ArrayStats(namedtuple("ArrayStats", "count sum mean m2 min max")):
+    """Mergeable summary statistics; m2 is the sum of squared deviations from the mean."""
+    __slots__ = ()
+
+    def var(self, ddof=0):
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof=0):
+        return np.sqrt(self.var(ddof))
+
+    def merge(self, other):
+        """Combines the statistics of two disjoint sets of values (Chan et al.)."""
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        return ArrayStats(count, self.sum + other.sum,
+                          self.mean + delta * (other.count / count),
+                          self.m2 + other.m2 + delta * delta * (self.count * other.count / count),
+                          np.minimum(self.min, other.min), np.maximum(self.max, other.max))
+
+def _block_stats(block, axis):
+    """Statistics of one in-memory block; its temporaries are block-sized, not array-sized."""
+    block = np.asarray(block)
+    count = block.size if axis is None else block.shape[axis]
+    accumulator = np.int64 if np.issubdtype(block.dtype, np.integer) else np.float64
+    total = block.sum(axis=axis, dtype=accumulator)
+    mean = total / count
+    deviations = np.subtract(block, mean if axis is None else np.expand_dims(mean, axis),
+                             dtype=np.float64)
+    m2 = np.square(deviations, out=deviations).sum(axis=axis)
+    return ArrayStats(count, total, mean, m2, block.min(axis=axis), block.max(axis=axis))
+
+def array_stats(array, axis=None, block_rows=None, workers=1):
+    """count/sum/mean/var/min/max of `array` in one blocked pass; returns ArrayStats.
+
+    axis=None reduces everything (like np.mean(array)); an integer axis
+    reduces along that axis (like np.mean(array, axis=axis)). The array is
+    walked in blocks of block_rows rows along axis 0 (sized to about
+    STATS_BLOCK_BYTES by default), reduced on `workers` threads.
+    """
+    if array.size == 0:
+        raise ValueError("array_stats() of an empty array")
+    if axis is not None:
+        axis = axis % array.ndim
+    if array.ndim == 0:
+        return _block_stats(array, axis)
+    if block_rows is None:
+        row_bytes = max(array.itemsize * (array.size // array.shape[0]), 1)
+        block_rows = max(STATS_BLOCK_BYTES // row_bytes, 1)
+    blocks = (array[start:start + block_rows] for start in range(0, array.shape[0], block_rows))
+    # At most 2 * workers blocks are in flight; partials are folded in as they finish
+    partials = _bounded_map(lambda block: _block_stats(block, axis), blocks,
+                            workers if workers > 1 else 0, ThreadPoolExecutor)
+
+    if axis is None or axis == 0:  # Every block covers part of each output cell: merge them
+        return reduce(ArrayStats.merge, partials)
+    # Reducing along another axis: each block already holds final values for its own rows
+    columns = list(zip(*partials))[1:]
+    return ArrayStats(array.shape[axis], *(np.concatenate(values) for values in columns))
 
 # Example usage (Uncomment to run)
 # numpy_operations()
 # pandas_operations()
+# stats = groupby_aggregate("events.csv", by="Age", aggs=["mean", "std"], workers=4)
+# expected = pd.read_csv("events.csv").groupby("Age")[["Salary"]].agg(["mean", "std"])
+# np.testing.assert_allclose(stats[expected.columns], expected)  # Equal within float tolerance
+# fillna_means("events.csv", "events_filled.csv")
+# df = read_csv_optimized("events.csv", arrow_strings=True)
+# df, report = optimize_dtypes(pd.read_csv("events.csv"))
+# print(report.sort_values("bytes_saved", ascending=False))
+# merge_left("events.parquet", "cities.csv", on="Name", out_path="joined.csv", workers=4)
+# big = np.memmap("features.f32", dtype=np.float32, mode="r").reshape(-1, 128)
+# stats = array_stats(big, axis=0, workers=8)  # One pass over the file
+# print(stats.count, stats.mean, stats.std(), stats.min, stats.max)
 
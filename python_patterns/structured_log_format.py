@@ -0,0 +1,110 @@
+import gzip
+import io
+import json
+import logging
+import struct
+import time
+
+try:
+    import zstandard  # Optional: needed to read .zst (zstd-compressed) segments
+except ImportError:
+    zstandard = None
+
+"""
+This module defines the structured log formats shared by the log writers in
+basic_logging_config.py and the scanners in error_email_patterns.py, so the
+writer's format and the reader's parser live in one place.
+
+Formats:
+- JSON lines: one object per record, written with "levelno" first so readers
+  can filter on the level without parsing the whole line.
+- Binary: length-prefixed records, RECORD_HEADER followed by the logger name
+  and the message as UTF-8. Readers can skip records by level from the header.
+
+Both readers accept plain, gzipped (.gz) or zstd (.zst) files and filter on
+min_level.
+"""
+
+# 1. Record Layout
+RECORD_HEADER = struct.Struct("<IdBH")  # payload length, created, levelno, name length
+JSON_LEVEL_PREFIX = b'{"levelno":'
+READ_CHUNK_SIZE = 1024 * 1024
+
+def encode_binary_record(created, levelno, name, message):
+    """Encodes one record in the binary format."""
+    name = name.encode('utf-8')
+    body = message.encode('utf-8')
+    return RECORD_HEADER.pack(len(name) + len(body), created, levelno, len(name)) + name + body
+
+def format_record(record):
+    """Renders a record dict from either reader as 'timestamp - name - message'."""
+    timestamp = record.get("ts") or time.strftime("%Y-%m-%d %H:%M:%S",
+                                                  time.localtime(record["created"]))
+    return f"{timestamp} - {record['name']} - {record['msg']}"
+
+# 2. Readers
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+def open_structured_log(log_file):
+    """Opens a plain, gzipped (.gz) or zstd (.zst) log file for binary reading.
+
+    zstd files can only be read forward: seekable() is False, so callers that
+    resume at an offset read up to it instead.
+    """
+    if log_file.endswith(".gz"):
+        return gzip.open(log_file, 'rb')
+    if log_file.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError(f"reading {log_file} requires the zstandard package")
+        # The raw stream reader is not line-iterable and may return short reads
+        reader = zstandard.ZstdDecompressor().stream_reader(open(log_file, 'rb'), closefd=True)
+        return io.BufferedReader(reader, READ_CHUNK_SIZE)
+    return open(log_file, 'rb')
+
+def read_json_log(log_file, min_level=logging.NOTSET):
+    """Yields records (dicts) from a JSON-lines log with levelno >= min_level."""
+    prefix_len = len(JSON_LEVEL_PREFIX)
+    with open_structured_log(log_file) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            if min_level and line.startswith(JSON_LEVEL_PREFIX):
+                if int(line[prefix_len:line.index(b",", prefix_len)]) < min_level:
+                    continue  # Skipped without parsing the rest of the line
+            record = json.loads(line)
+            if record.get("levelno", 0) >= min_level:
+                yield record
+
+def read_binary_log(log_file, min_level=logging.NOTSET, chunk_size=READ_CHUNK_SIZE):
+    """Yields records (dicts) from a binary log, skipping lower levels by header only."""
+    header_size = RECORD_HEADER.size
+    with open_structured_log(log_file) as file:
+        buffer = b""
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            buffer += chunk
+            pos = 0
+            while pos + header_size <= len(buffer):
+                length, created, levelno, name_len = RECORD_HEADER.unpack_from(buffer, pos)
+                end = pos + header_size + length
+                if end > len(buffer):
+                    break  # Record continues in the next chunk
+                if levelno >= min_level:
+                    start = pos + header_size
+                    yield {
+                        "levelno": levelno,
+                        "level": logging.getLevelName(levelno),
+                        "created": created,
+                        "name": buffer[start:start + name_len].decode('utf-8'),
+                        "msg": buffer[start + name_len:end].decode('utf-8', errors='replace'),
+                    }
+                pos = end
+            buffer = buffer[pos:]
+
+# Example Usage (Uncomment to run)
+# with open("app.bin", "ab") as file:
+#     file.write(encode_binary_record(time.time(), logging.ERROR, "MyApp", "Disk full"))
+# for record in read_binary_log("app.bin", min_level=logging.ERROR):
+#     print(format_record(record))
@@ -1,13 +1,15 @@
 import tensorflow as tf
 import numpy as np
 import pandas as pd
-from sklearn.decomposition import PCA
+from sklearn.decomposition import PCA, IncrementalPCA
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error
 import matplotlib.pyplot as plt
 
+from pandas_np import read_csv_optimized
+
 """
 This script provides common patterns for using TensorFlow in Machine Learning,
 performing Principal Component Analysis (PCA), and handling various data science tasks including forecasting.
@@ -15,6 +17,7 @@ performing Principal Component Analysis (PCA), and handling various data science
 Topics Covered:
 - Building and training a simple TensorFlow neural network
 - Using PCA for dimensionality reduction
+- Streaming (chunked) scaling and PCA for data larger than memory
 - Preprocessing data with StandardScaler
 - Performing exploratory data analysis
 - Implementing linear regression for forecasting
@@ -44,17 +47,129 @@ def perform_pca(data, n_components=2):
     
     return principal_components, pca.explained_variance_ratio_
 
-# 3. Data Analysis Example (Pandas + NumPy)
-def load_and_analyze_data(csv_path):
-    """Loads a CSV file into a Pandas DataFrame and performs basic analysis."""
-    df = pd.read_csv(csv_path)
+# 3. Streaming PCA for Data Larger than Memory
+# perform_pca keeps the input and a scaled copy in memory at once.
+# perform_pca_streaming only ever holds one chunk: the scaler is fitted from
+# running moments, the projection from chunk-wise updates, and the data is
+# then transformed chunk by chunk.
+def _iter_chunks(data, chunk_size):
+    """Row chunks of an array/np.memmap, or the chunks from calling `data` if it is callable."""
+    if callable(data):
+        yield from data()
+    else:
+        for start in range(0, len(data), chunk_size):
+            yield data[start:start + chunk_size]
+
+def _rechunk(chunks, min_rows):
+    """Merges small chunks (e.g. a short last one) so each has at least min_rows rows."""
+    pending = []
+    for chunk in chunks:
+        pending.append(np.asarray(chunk))
+        if sum(len(part) for part in pending) >= min_rows:
+            yield pending[0] if len(pending) == 1 else np.concatenate(pending)
+            pending = []
+    if pending:
+        yield np.concatenate(pending)
+
+def _covariance_pca(data, chunk_size, n_components):
+    """One pass: merges per-chunk means and scatter matrices (Chan et al.), then eigendecomposes."""
+    count, mean, scatter = 0, None, None
+    for chunk in _iter_chunks(data, chunk_size):
+        chunk = np.asarray(chunk, dtype=np.float64)
+        chunk_mean = chunk.mean(axis=0)
+        centered = chunk - chunk_mean
+        chunk_scatter = centered.T @ centered
+        if mean is None:
+            count, mean, scatter = len(chunk), chunk_mean, chunk_scatter
+            continue
+        total = count + len(chunk)
+        delta = chunk_mean - mean
+        scatter += chunk_scatter + np.outer(delta, delta) * (count * len(chunk) / total)
+        mean = mean + delta * (len(chunk) / total)
+        count = total
+
+    scale = np.sqrt(np.diag(scatter) / count)  # Population std, as StandardScaler uses
+    scale[scale == 0] = 1.0
+    correlation = scatter / np.outer(scale, scale) / (count - 1)
+    eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+    order = np.argsort(eigenvalues)[::-1]
+    components = eigenvectors[:, order[:n_components]].T
+    # Same sign convention as PCA (svd_flip): largest-magnitude loading is positive
+    signs = np.sign(components[np.arange(n_components), np.abs(components).argmax(axis=1)])
+    components *= signs[:, None]
+    ratio = eigenvalues[order[:n_components]] / eigenvalues.sum()
+    return mean, scale, components, ratio
+
+def perform_pca_streaming(data, n_components=2, chunk_size=10_000, method="incremental",
+                          scale_inplace=False):
+    """Chunked PCA for data that does not fit in memory; same return values as perform_pca.
+
+    `data` is an array or np.memmap (read chunk_size rows at a time) or a
+    zero-argument function returning a fresh iterator of 2-D chunks (it is
+    called once per pass).
+
+    method="incremental" fits StandardScaler.partial_fit and IncrementalPCA
+    (three passes over the data; approximate, since only n_components
+    directions are kept between chunks). method="covariance" builds the
+    feature correlation matrix in a single pass and eigendecomposes it; it
+    matches perform_pca exactly, but needs n_features**2 memory.
+
+    scale_inplace=True scales each chunk as float32 without a fresh array per
+    step. Chunks are only overwritten when they belong to a copy-on-write
+    memmap (mode="c") or were converted to float32 here; other writable
+    float32 chunks are scaled into one reused scratch buffer, so the
+    caller's array is never modified.
+    """
+    if method == "incremental":
+        scaler = StandardScaler()
+        for chunk in _iter_chunks(data, chunk_size):
+            scaler.partial_fit(chunk)
+        mean, scale = scaler.mean_, scaler.scale_
+        ipca = IncrementalPCA(n_components=n_components)
+        for chunk in _rechunk(_iter_chunks(data, chunk_size), n_components):
+            ipca.partial_fit((chunk - mean) / scale)
+        components, ratio = ipca.components_, ipca.explained_variance_ratio_
+    elif method == "covariance":
+        mean, scale, components, ratio = _covariance_pca(data, chunk_size, n_components)
+    else:
+        raise ValueError("method must be 'incremental' or 'covariance'")
+
+    if scale_inplace:
+        mean, scale, components = (array.astype(np.float32) for array in (mean, scale, components))
+    copy_on_write = isinstance(data, np.memmap) and data.mode == "c"
+    projected, scratch = [], None
+    for chunk in _iter_chunks(data, chunk_size):
+        if scale_inplace:
+            chunk = np.asarray(chunk)
+            if chunk.dtype == np.float32 and chunk.flags.writeable and not copy_on_write:
+                if scratch is None or len(scratch) < len(chunk) or scratch.shape[1:] != chunk.shape[1:]:
+                    scratch = np.empty_like(chunk)
+                chunk = np.subtract(chunk, mean, out=scratch[:len(chunk)])
+            else:
+                if chunk.dtype != np.float32 or not chunk.flags.writeable:
+                    chunk = chunk.astype(np.float32)  # Our own copy: safe to overwrite
+                chunk -= mean
+            chunk /= scale
+            projected.append(chunk @ components.T)
+        else:
+            projected.append(((chunk - mean) / scale) @ components.T)
+    return np.concatenate(projected), ratio
+
+# 4. Data Analysis Example (Pandas + NumPy)
+def load_and_analyze_data(csv_path, optimize=False):
+    """Loads a CSV file into a Pandas DataFrame and performs basic analysis.
+
+    optimize=True loads with compact dtypes (downcast numerics, category
+    strings) via pandas_np.read_csv_optimized.
+    """
+    df = read_csv_optimized(csv_path) if optimize else pd.read_csv(csv_path)
     print("First few rows:")
     print(df.head())
     print("\nSummary Statistics:")
     print(df.describe())
     return df
 
-# 4. Implementing Linear Regression for Forecasting
+# 5. Implementing Linear Regression for Forecasting
 def linear_regression_forecasting(df, target_column):
     """Implements a simple linear regression model for forecasting."""
     X = df.drop(columns=[target_column])  # Features
@@ -76,7 +191,7 @@ def linear_regression_forecasting(df, target_column):
     
     return model, y_test, y_pred
 
-# 5. Visualizing Data Trends
+# 6. Visualizing Data Trends
 def plot_forecast(y_test, y_pred):
     """Plots actual vs predicted values for forecasting visualization."""
     plt.figure(figsize=(10, 5))
@@ -96,7 +211,12 @@ def plot_forecast(y_test, y_pred):
 # pca_result, variance = perform_pca(sample_data, n_components=2)
 # print("PCA Variance Ratio:", variance)
 
-# df = load_and_analyze_data("sample_data.csv")
+# big = np.memmap("features.f32", dtype=np.float32, mode="c").reshape(-1, 64)  # Copy-on-write
+# pca_result, variance = perform_pca_streaming(big, n_components=10, chunk_size=50_000,
+#                                              method="covariance", scale_inplace=True)
+# print("PCA Variance Ratio:", variance)
+
+# df = load_and_analyze_data("sample_data.csv")  # optimize=True for large files
 # trained_model, actual, predicted = linear_regression_forecasting(df, target_column="Price")
 # plot_forecast(actual, predicted)
 
@@ -0,0 +1,39 @@
+import os
+import shutil
+
+from error_email_patterns import scan_new_log_errors
+
+"""
+Tests for the incremental log scanner in error_email_patterns.py.
+"""
+
+def write_lines(path, prefix, count, mode='w'):
+    with open(path, mode) as file:
+        for i in range(count):
+            file.write(f"2024-01-01 00:00:00 - ERROR - {prefix} {i}\n")
+
+def test_scan_new_log_errors_reads_only_appended_lines(tmp_path):
+    log_file = str(tmp_path / "app.log")
+    write_lines(log_file, "first", 10)
+    assert scan_new_log_errors(log_file).counts["ERROR"] == 10
+    write_lines(log_file, "more", 4, mode='a')
+    assert scan_new_log_errors(log_file).counts["ERROR"] == 4
+    assert scan_new_log_errors(log_file).counts["ERROR"] == 0
+
+def test_scan_new_log_errors_detects_file_rewritten_in_place(tmp_path):
+    log_file = str(tmp_path / "app.log")
+    write_lines(log_file, "old", 10)
+    assert scan_new_log_errors(log_file).counts["ERROR"] == 10
+
+    # copytruncate-style rotation: the old contents (plus an unread tail) move
+    # to app.log.1 and app.log is rewritten in place, keeping its inode
+    inode = os.stat(log_file).st_ino
+    write_lines(log_file, "old tail", 5, mode='a')
+    shutil.copyfile(log_file, log_file + ".1")
+    write_lines(log_file, "new", 23)
+    assert os.stat(log_file).st_ino == inode
+
+    summary = scan_new_log_errors(log_file)
+    assert summary.counts["ERROR"] == 5 + 23
+    assert summary.recent[0].endswith("old tail 0")
+    assert summary.recent[-1].endswith("new 22")
@@ -0,0 +1,43 @@
+import json
+import logging
+
+import pytest
+
+from error_email_patterns import scan_log_for_errors
+from structured_log_format import encode_binary_record, read_binary_log, read_json_log
+
+"""
+Tests for reading zstd-compressed structured logs (skipped without zstandard).
+"""
+
+zstandard = pytest.importorskip("zstandard")
+
+LEVELS = [logging.INFO, logging.ERROR, logging.DEBUG, logging.CRITICAL] * 25
+
+def write_zst(path, data):
+    path.write_bytes(zstandard.ZstdCompressor().compress(data))
+    return str(path)
+
+def test_read_json_log_zst(tmp_path):
+    lines = [json.dumps({"levelno": level, "name": "app", "msg": str(i), "ts": "t"}) + "\n"
+             for i, level in enumerate(LEVELS)]
+    log_file = write_zst(tmp_path / "app.jsonl.zst", "".join(lines).encode('utf-8'))
+    records = list(read_json_log(log_file, min_level=logging.ERROR))
+    assert [record["levelno"] for record in records] == [l for l in LEVELS if l >= logging.ERROR]
+
+def test_read_binary_log_zst(tmp_path):
+    data = b"".join(encode_binary_record(0.0, level, "app", str(i)) for i, level in enumerate(LEVELS))
+    log_file = write_zst(tmp_path / "app.bin.zst", data)
+    records = list(read_binary_log(log_file, min_level=logging.ERROR, chunk_size=64))
+    assert len(records) == 50
+    assert records[-1]["msg"] == str(len(LEVELS) - 1)
+
+def test_scan_log_for_errors_zst_from_offset(tmp_path):
+    lines = [f"2024-01-01 - {logging.getLevelName(level)} - line {i}\n" for i, level in enumerate(LEVELS)]
+    data = "".join(lines).encode('utf-8')
+    log_file = write_zst(tmp_path / "app.log.1.zst", data)
+    assert scan_log_for_errors(log_file).counts == {"ERROR": 25, "CRITICAL": 25}
+    start = len("".join(lines[:50]).encode('utf-8'))
+    summary = scan_log_for_errors(log_file, start=start, chunk_size=100)
+    assert summary.counts == {"ERROR": 12, "CRITICAL": 13}
+    assert summary.recent[0].endswith("line 51")
@@ -1,7 +1,28 @@
+import contextlib
+import hashlib
+import io
+import os
+import pickle
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
 import xml.etree.ElementTree as ET
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
+from xml.sax.saxutils import escape, quoteattr
+
 import xmltodict
 import yaml
 
+try:
+    # libyaml-backed C loader/dumper: same output, many times faster than pure Python
+    from yaml import CDumper as YamlDumper, CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import Dumper as YamlDumper, SafeLoader as YamlSafeLoader
+
 """
 ElementTree (ET) is a lightweight Python library for parsing and creating XML documents. 
 It represents an XML document as a tree structure, where each element is a node with attributes and text content.
@@ -12,6 +33,7 @@ Key Components:
 - `ET.Element(tag)`: Creates a new XML element with the specified tag.
 - `ET.SubElement(parent, tag)`: Creates a sub-element inside the specified parent element.
 - `tree.write(file)`: Writes the XML tree to a file.
+- `ET.iterparse(file, events)`: Parses incrementally, emitting elements as they complete.
 
 xmltodict is another library for working with XML in a way similar to JSON parsing:
 - `xmltodict.parse(xml_string)`: Converts XML to an OrderedDict.
@@ -47,11 +69,14 @@ def write_xml(file_path, root_element, data):
     print(f"XML file written: {file_path}")
 
 # 3. Read XML File using xmltodict
-def read_xml_dict(file_path):
-    """Reads an XML file and converts it into a dictionary using xmltodict."""
-    with open(file_path, 'r', encoding='utf-8') as file:
-        xml_content = file.read()
-        return xmltodict.parse(xml_content)
+def read_xml_dict(file_path, cache=None):
+    """Reads an XML file and converts it into a dictionary using xmltodict.
+
+    With a ConfigCache (see 8) the result is memoized and returned frozen.
+    """
+    if cache is not None:
+        return cache.load(file_path, "xml")
+    return _parse_xml_dict(file_path)
 
 # 4. Write XML File using xmltodict
 def write_xml_dict(file_path, data):
@@ -62,12 +87,15 @@ def write_xml_dict(file_path, data):
     print(f"XML file written using xmltodict: {file_path}")
 
 # 5. Read YAML File
-def read_yaml(file_path):
-    """Reads a YAML file and returns its contents as a dictionary."""
-    # Open the file in read mode
-    with open(file_path, 'r') as file:
-        # Use yaml.safe_load to safely parse the YAML content into a dictionary
-        return yaml.safe_load(file)
+def read_yaml(file_path, cache=None):
+    """Reads a YAML file and returns its contents as a dictionary.
+
+    With a ConfigCache (see 8) the result is memoized and returned frozen.
+    """
+    if cache is not None:
+        return cache.load(file_path, "yaml")
+    # Safe loading (no arbitrary Python objects), using libyaml when available
+    return _parse_yaml(file_path)
 
 # 6. Write YAML File
 def write_yaml(file_path, data):
@@ -75,14 +103,394 @@ def write_yaml(file_path, data):
     # Open the file in write mode
     with open(file_path, 'w') as file:
         # Convert the dictionary into YAML format and write it to the file
-        yaml.dump(data, file)
+        yaml.dump(data, file, Dumper=YamlDumper)
+    print(f"YAML file written: {file_path}")
+
+# 7. Stream XML Records using iterparse
+# For multi-GB record dumps: iterparse emits elements as they are parsed, and
+# each record is cleared and detached from its parent once it has been
+# yielded, so memory stays roughly constant however long the file is.
+XML_DICT_BATCH = 500  # Records per task when converting to dicts on a process pool
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def _path_matches(stack, path):
+    """True if the open-tag stack ends with `path` (segments match full or local tag names)."""
+    if len(stack) < len(path):
+        return False
+    return all(segment == tag or segment == _local_name(tag)
+               for segment, tag in zip(path, stack[-len(path):]))
+
+def element_to_dict(element):
+    """Converts an element to xmltodict's layout: '@attr' keys, '#text', repeated tags as lists."""
+    text = "".join([element.text or ""] + [child.tail or "" for child in element]).strip() or None
+    if not element.attrib and not len(element):
+        return text
+    result = {f"@{name}": value for name, value in element.attrib.items()}
+    for child in element:
+        value = element_to_dict(child)
+        if child.tag in result:
+            if not isinstance(result[child.tag], list):
+                result[child.tag] = [result[child.tag]]
+            result[child.tag].append(value)
+        else:
+            result[child.tag] = value
+    if text is not None:
+        result["#text"] = text
+    return result
+
+def _xml_batch_to_dicts(serialized):
+    """Worker entry point: parses serialized record elements and converts them to dicts."""
+    return [element_to_dict(ET.fromstring(record)) for record in serialized]
+
+def _iter_record_elements(file_path, path):
+    stack, elements = [], []
+    record_depth = None  # Depth of the record currently being built, if any
+    for event, element in ET.iterparse(file_path, events=("start", "end")):
+        if event == "start":
+            stack.append(element.tag)
+            elements.append(element)
+            if record_depth is None and _path_matches(stack, path):
+                record_depth = len(stack)
+            continue
+        depth = len(stack)
+        stack.pop()
+        elements.pop()
+        if depth == record_depth:
+            yield element
+            record_depth = None
+        elif record_depth is not None:
+            continue  # Part of a record that is still open
+        element.clear()  # Drop yielded records and anything outside records
+        if elements:
+            elements[-1].remove(element)
+
+def iter_xml_records(file_path, record_path, as_dict=False, workers=0, batch_size=XML_DICT_BATCH):
+    """Yields the records under `record_path` one at a time, in document order.
+
+    record_path is a '/'-separated tag path such as "catalog/book" or just
+    "book"; it matches elements whose enclosing tags end with that path.
+    Elements are only valid until the next record is requested (they are
+    cleared afterwards) - copy what you need. With as_dict=True each record
+    is converted like xmltodict would convert it; workers > 0 does that
+    conversion on a process pool, keeping at most 2 * workers batches in
+    flight so memory stays bounded.
+    """
+    path = [segment for segment in record_path.strip('/').split('/') if segment]
+    records = _iter_record_elements(file_path, path)
+    if not as_dict:
+        yield from records
+        return
+    if not workers:
+        for element in records:
+            yield element_to_dict(element)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        batch = []
+        for element in records:
+            batch.append(ET.tostring(element))
+            if len(batch) >= batch_size:
+                pending.append(executor.submit(_xml_batch_to_dicts, batch))
+                batch = []
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+        if batch:
+            pending.append(executor.submit(_xml_batch_to_dicts, batch))
+        while pending:
+            yield from pending.popleft().result()
+
+# 8. Cached Config Loading
+# Config files are read far more often than they change. ConfigCache keeps
+# parsed results keyed by path and validated against the file's mtime and
+# size, so a repeat read costs one os.stat. Results are handed out as frozen
+# views (mappings are read-only, lists become tuples) so one caller cannot
+# change what the next one sees; ask for mutable=True to get a private copy.
+# With snapshot_dir set, parsed results are also pickled to disk, so a fresh
+# process skips re-parsing files that have not changed.
+def freeze(value):
+    """Returns a read-only view: dicts -> MappingProxyType, lists -> tuples, sets -> frozensets."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+def _parse_yaml(file_path):
+    with open(file_path, 'rb') as file:
+        return yaml.load(file, Loader=YamlSafeLoader)
+
+def _parse_xml_dict(file_path):
+    with open(file_path, 'rb') as file:
+        return xmltodict.parse(file)  # Parsed straight from the file, no intermediate string
+
+CONFIG_PARSERS = {"yaml": _parse_yaml, "xml": _parse_xml_dict}
+
+class _ConfigEntry:
+    __slots__ = ("signature", "frozen", "pickled")
+
+    def __init__(self, signature, frozen, pickled):
+        self.signature = signature  # (mtime_ns, size) of the file that was parsed
+        self.frozen = frozen
+        self.pickled = pickled  # Source for cheap private copies and disk snapshots
+
+class ConfigCache:
+    """LRU cache of parsed config files, invalidated by mtime/size; see the section note."""
+    def __init__(self, max_entries=128, snapshot_dir=None):
+        self.max_entries = max_entries
+        self.snapshot_dir = snapshot_dir
+        if snapshot_dir:
+            os.makedirs(snapshot_dir, exist_ok=True)
+        self._entries = OrderedDict()  # (path, parser) -> _ConfigEntry, least recently used first
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "snapshot_hits": 0, "misses": 0, "evictions": 0}
+
+    def _snapshot_path(self, key):
+        digest = hashlib.sha256("\0".join(key).encode()).hexdigest()
+        return os.path.join(self.snapshot_dir, f"{digest}.pickle")
+
+    def _load_snapshot(self, key, signature):
+        try:
+            with open(self._snapshot_path(key), 'rb') as file:
+                saved_signature, pickled = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        return pickled if tuple(saved_signature) == signature else None
+
+    def _save_snapshot(self, key, signature, pickled):
+        path = self._snapshot_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            pickle.dump((signature, pickled), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)  # Concurrent readers never see a partial snapshot
+
+    def load(self, file_path, parser="yaml", mutable=False):
+        """Returns the parsed contents of file_path, re-parsing only if the file changed.
+
+        `parser` is "yaml" or "xml" (xmltodict). The result is a frozen view
+        shared by all callers, or a private deep copy when mutable=True.
+        """
+        key = (os.path.abspath(file_path), parser)
+        stat = os.stat(file_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return pickle.loads(entry.pickled) if mutable else entry.frozen
+
+        pickled = self._load_snapshot(key, signature) if self.snapshot_dir else None
+        if pickled is not None:
+            data = pickle.loads(pickled)
+            stat_name = "snapshot_hits"
+        else:
+            data = CONFIG_PARSERS[parser](file_path)
+            pickled = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+            stat_name = "misses"
+            if self.snapshot_dir:
+                self._save_snapshot(key, signature, pickled)
+        entry = _ConfigEntry(signature, freeze(data), pickled)
+        with self._lock:
+            self.stats[stat_name] += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        return data if mutable else entry.frozen
+
+    def invalidate(self, file_path=None):
+        """Forgets one file (all parsers) or, with no argument, everything held in memory."""
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+                return
+            path = os.path.abspath(file_path)
+            for key in [key for key in self._entries if key[0] == path]:
+                del self._entries[key]
+
+_default_config_cache = None
+_default_config_cache_lock = threading.Lock()
+
+def get_config_cache():
+    """Returns the process-wide ConfigCache, creating it on first use."""
+    global _default_config_cache
+    with _default_config_cache_lock:
+        if _default_config_cache is None:
+            _default_config_cache = ConfigCache()
+        return _default_config_cache
+
+def load_config(file_path, mutable=False, cache=None):
+    """Loads a .yaml/.yml or .xml config through the (default) ConfigCache."""
+    parser = "xml" if file_path.lower().endswith(".xml") else "yaml"
+    return (cache or get_config_cache()).load(file_path, parser, mutable)
+
+# 9. Stream Records to XML / YAML Files
+# The writers above build the whole document in memory first. These take any
+# iterable of records and write each one to a buffered file as soon as it is
+# serialized, so memory use does not grow with the number of records.
+WRITE_BUFFER_SIZE = 1024 * 1024
+# Characters XML 1.0 does not allow anywhere in a document, even escaped
+_XML_ILLEGAL_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+
+def _xml_text(value):
+    """Converts a value to text as xmltodict does (lowercase bools), minus XML-illegal characters."""
+    if isinstance(value, bool):
+        value = "true" if value else "false"
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        value = bytes(value).decode('utf-8', errors='replace')
+    return _XML_ILLEGAL_CHARS.sub("", str(value))
+
+def _xml_fragments(tag, value, out):
+    """Appends the escaped XML for one value (xmltodict layout) to `out`."""
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            _xml_fragments(tag, item, out)
+        return
+    if not isinstance(value, dict):
+        if value is None:
+            out.append(f"<{tag}/>")
+        else:
+            out.append(f"<{tag}>{escape(_xml_text(value))}</{tag}>")
+        return
+    attributes = "".join(f" {key[1:]}={quoteattr(_xml_text(item))}"
+                         for key, item in value.items() if key.startswith("@"))
+    children = [(key, item) for key, item in value.items()
+                if not key.startswith("@") and key != "#text"]
+    text = value.get("#text")
+    if not children and text is None:
+        out.append(f"<{tag}{attributes}/>")
+        return
+    out.append(f"<{tag}{attributes}>")
+    if text is not None:
+        out.append(escape(_xml_text(text)))
+    for key, item in children:
+        _xml_fragments(key, item, out)
+    out.append(f"</{tag}>")
+
+class XmlRecordWriter:
+    """Writes <root_tag><record_tag>...</record_tag>...</root_tag> one record at a time.
+
+    Records are dicts in xmltodict's layout ('@attr' keys, '#text', nested
+    dicts, lists for repeated tags); text and attribute values are escaped,
+    characters XML 1.0 forbids (e.g. "\x00") are dropped and bools are
+    written as true/false, as xmltodict.unparse does.
+    """
+    def __init__(self, file_path, root_tag="records", record_tag="record",
+                 buffer_size=WRITE_BUFFER_SIZE):
+        self.root_tag = root_tag
+        self.record_tag = record_tag
+        self.count = 0
+        self.file = open(file_path, 'w', encoding='utf-8', buffering=buffer_size)
+        self.file.write(f"<?xml version='1.0' encoding='utf-8'?>\n<{root_tag}>\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, record):
+        out = []
+        _xml_fragments(self.record_tag, record, out)
+        out.append("\n")
+        self.file.write("".join(out))
+        self.count += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        if not self.file.closed:
+            self.file.write(f"</{self.root_tag}>\n")
+            self.file.close()
+
+def write_xml_records(file_path, records, root_tag="records", record_tag="record"):
+    """Streams an iterable of record dicts to an XML file; returns the record count."""
+    with XmlRecordWriter(file_path, root_tag, record_tag) as writer:
+        writer.write_many(records)
+    print(f"XML file written: {file_path}")
+    return writer.count
+
+def write_yaml_documents(file_path, records):
+    """Streams an iterable of records to a multi-document YAML file (one '---' document each)."""
+    with open(file_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as file:
+        # dump_all consumes the iterable lazily, emitting each document as it goes
+        yaml.dump_all(records, file, Dumper=YamlDumper, explicit_start=True)
     print(f"YAML file written: {file_path}")
 
+def iter_yaml_documents(file_path):
+    """Yields the documents of a multi-document YAML file one at a time."""
+    with open(file_path, 'rb') as file:
+        yield from yaml.load_all(file, Loader=YamlSafeLoader)
+
+def _measure(function):
+    """Runs function twice: once for wall time, once under tracemalloc for peak memory."""
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak
+
+def benchmark_writers(n_records=100_000):
+    """Compares the in-memory writers with the streaming ones (time and peak memory)."""
+    def records():
+        return ({"@id": str(i), "name": f"item <{i}> & co", "price": i * 0.5, "tags": ["a", "b"]}
+                for i in range(n_records))
+
+    def element_tree(path):
+        root = ET.Element("records")
+        for record in records():
+            element = ET.SubElement(root, "record", id=record["@id"])
+            for key in ("name", "price"):
+                ET.SubElement(element, key).text = str(record[key])
+            for tag in record["tags"]:
+                ET.SubElement(element, "tags").text = tag
+        ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+    def yaml_whole(path):
+        with open(path, 'w', encoding='utf-8') as file:
+            yaml.dump_all(list(records()), file, Dumper=YamlDumper, explicit_start=True)
+
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        path = os.path.join(tmp_dir, "out")
+        results = [
+            ("ElementTree build + write", lambda: element_tree(path)),
+            ("xmltodict.unparse (write_xml_dict)",
+             lambda: write_xml_dict(path, {"records": {"record": list(records())}})),
+            ("write_xml_records (streaming)", lambda: write_xml_records(path, records())),
+            ("yaml.dump_all of a list", lambda: yaml_whole(path)),
+            ("write_yaml_documents (streaming)", lambda: write_yaml_documents(path, records())),
+        ]
+        results = [(name, *_measure(function)) for name, function in results]
+    for name, elapsed, peak in results:
+        print(f"{name:36s} {elapsed:6.2f}s  peak {peak / 1e6:8.1f} MB")
+
 # Example usage (Uncomment to run)
 # xml_data = read_xml("example.xml")
 # write_xml("output.xml", "Person", {"Name": "Alice", "Age": "30"})
 # xml_dict = read_xml_dict("example.xml")
+# for book in iter_xml_records("catalog.xml", "catalog/book", as_dict=True, workers=4):
+#     print(book["title"])
 # write_xml_dict("output_dict.xml", {"Person": {"Name": "Alice", "Age": 30}})
 # yaml_data = read_yaml("example.yaml")
+# settings = load_config("settings.yaml")  # Cached; re-parsed only after the file changes
+# cache = ConfigCache(max_entries=64, snapshot_dir=".config_cache")
+# settings = read_yaml("settings.yaml", cache=cache)
 # write_yaml("output.yaml", {"Name": "Alice", "Age": 30})
+# write_xml_records("people.xml", ({"@id": str(i), "Name": f"Person {i}"} for i in range(1_000_000)),
+#                   root_tag="People", record_tag="Person")
+# write_yaml_documents("people.yaml", ({"Name": f"Person {i}"} for i in range(1_000_000)))
+# benchmark_writers(100_000)
 